@@ -1,45 +1,402 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 import uuid
-from llm_score import score_resume  # Import your LLM scoring function
+import json
+import logging
+import os
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from llm_score import score_resumes, iter_scored_resumes, extract_jd_profile, explain_resume_async, SCORING_MODES  # Import your LLM scoring function
+from utils.parser import extract_structured_data_from_text, extract_skills
+from utils.skill_index import SkillIndex
+from utils.scorer import rank_matrix, rank_resumes_against_job, score_matrix
+from utils.metrics import ERRORS, STAGE_SECONDS, maybe_save_process_metrics, render_prometheus
 
 app = Flask(__name__)
 CORS(app)
 
+# Reject oversized bodies before they are read (Flask answers 413)
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_REQUEST_MB", "10")) * 1024 * 1024
+MAX_RESUMES_PER_REQUEST = int(os.getenv("MAX_RESUMES_PER_REQUEST", "1000"))
+MAX_JOB_DESCRIPTIONS_PER_REQUEST = int(os.getenv("MAX_JOB_DESCRIPTIONS_PER_REQUEST", "100"))
+# How long /explain waits for the agent crew before answering 504
+EXPLAIN_TIMEOUT_SECONDS = float(os.getenv("EXPLAIN_TIMEOUT_SECONDS", "120"))
+
+# Load spaCy, the skills classifier and the LLM client up front. Under the
+# gunicorn config this runs in the master before forking, so every worker
+# shares the loaded models copy-on-write instead of loading its own.
+def preload_models():
+    from utils import parser
+    from utils.nlp_models import get_nlp
+    import llm_score
+
+    started = time.perf_counter()
+    if parser.HAS_SPACY:
+        get_nlp()
+    logging.info(json.dumps({
+        "event": "preload",
+        "spacy": parser.HAS_SPACY,
+        "skills_classifier": parser.HAS_ML_PARSER and parser.ml_parser.skills_classifier is not None,
+        "llm": llm_score.llm.model_name,
+        "seconds": round(time.perf_counter() - started, 3)
+    }))
+
+# Indices of the resumes sharing at least min_shared skills with the JD, plus
+# the prefilter's selectivity stats
+def prefilter_by_skills(resume_skills, jd_text, min_shared):
+    skill_index = SkillIndex()
+    for index, skills in enumerate(resume_skills):
+        skill_index.add(index, skills)
+    shortlist = sorted(skill_index.prefilter(extract_skills(None, jd_text), min_shared))
+    return shortlist, skill_index.last_stats
+
+# Time every request per endpoint; streamed responses are timed up to the
+# first byte, their full duration is recorded as "score_stream_total"
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+    g.log_fields = {}
+
+# One structured log line per request: sizes and counts set by the handler
+# in g.log_fields, never the resume or JD texts themselves
+@app.after_request
+def record_request_time(response):
+    started = g.pop("request_started", None)
+    if started is not None and request.endpoint not in (None, "metrics"):
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=f"request_{request.endpoint}")
+        logging.info(json.dumps({
+            "event": "request",
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "bytes_in": request.content_length or 0,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            **g.pop("log_fields", {})
+        }))
+    # Share this worker's counts with the /metrics of the other workers
+    maybe_save_process_metrics()
+    return response
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": f"Request body larger than {app.config['MAX_CONTENT_LENGTH']} bytes"}), 413
+
+# Shared validation of the resume batch size; returns an error response or None
+def check_batch_size(resumes):
+    if len(resumes) > MAX_RESUMES_PER_REQUEST:
+        return jsonify({"error": f"Too many resumes (max {MAX_RESUMES_PER_REQUEST} per request)"}), 413
+    return None
+
+# Optional integer field of a JSON request body; returns (value, None), or
+# (None, error response) when it isn't an integer of at least minimum
+def int_field(data, name, default=None, minimum=1):
+    value = data.get(name, default)
+    if value is None:
+        return None, None
+    error = jsonify({"error": f"{name} must be an integer >= {minimum}"}), 400
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        return None, error
+    try:
+        value = int(value)
+    except ValueError:
+        return None, error
+    return (value, None) if value >= minimum else (None, error)
+
 @app.route("/", methods=["GET"])
 def hello():
     return "Flask AI model server is running!"
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text exposition; p50/p99 per stage come from
+    # histogram_quantile() over neohire_stage_seconds_bucket. Under gunicorn
+    # the values are summed over all workers (see METRICS_MULTIPROC_DIR)
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
 @app.route("/score", methods=["POST"])
 def score():
-    print("✅ Received request")
-
     try:
         data = request.get_json()
-        print("📦 Data:", data)
 
         resumes = data.get("resumes", [])
         jd_text = data.get("job_description", "")
+        # "fast" skips the agent crew; "crew" runs it as before
+        mode = data.get("mode", "fast")
+        g.log_fields.update(resumes=len(resumes), jd_chars=len(jd_text), mode=mode)
 
         if not resumes or not jd_text:
             return jsonify({"error": "Missing resumes or job_description"}), 400
+        if mode not in SCORING_MODES:
+            return jsonify({"error": f"Unknown mode: {mode}"}), 400
+        min_shared, invalid = int_field(data, "min_shared_skills", minimum=0)
+        if invalid:
+            return invalid
+        too_large = check_batch_size(resumes)
+        if too_large:
+            return too_large
+
+        # Extract the JD once for the whole batch (cached across requests)
+        jd_data = extract_jd_profile(jd_text)
+
+        # Score resumes concurrently (bounded by SCORE_CONCURRENCY), keeping input order
+        resumes = [resume for resume in resumes if resume.get("text", "")]
+
+        # Optionally send only resumes sharing enough skills with the JD to the LLM
+        prefilter = None
+        if min_shared is not None:
+            shortlist, prefilter = prefilter_by_skills(
+                [extract_skills(None, resume["text"]) for resume in resumes], jd_text, min_shared)
+            resumes = [resumes[index] for index in shortlist]
+
+        scores = score_resumes([resume["text"] for resume in resumes], jd_text, jd_data=jd_data, mode=mode)
 
         results = []
-        for resume in resumes:
-            resume_text = resume.get("text", "")
-            if not resume_text:
-                continue
-            result = score_resume(resume_text, jd_text)
+        for resume, result in zip(resumes, scores):
             result["id"] = resume.get("id")
             result["filename"] = resume.get("filename")
             results.append(result)
 
-        return jsonify({"results": results})
+        g.log_fields["scored"] = len(results)
+        response = {"results": results}
+        if prefilter is not None:
+            response["prefilter"] = prefilter
+        return jsonify(response)
+
+    except HTTPException:
+        # e.g. 413 for an oversized body
+        raise
+    except Exception as e:
+        logging.exception(f"{request.endpoint} request failed")
+        ERRORS.inc(stage="request_score")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/score/stream", methods=["POST"])
+def score_stream():
+    # Same payload as /score, but each result is sent as soon as it is scored
+    # (completion order), followed by one summary record. The response is
+    # NDJSON by default, or server-sent events with ?format=sse or
+    # "Accept: text/event-stream".
+    try:
+        data = request.get_json()
+
+        resumes = data.get("resumes", [])
+        jd_text = data.get("job_description", "")
+        mode = data.get("mode", "fast")
+        g.log_fields.update(resumes=len(resumes), jd_chars=len(jd_text), mode=mode)
+
+        if not resumes or not jd_text:
+            return jsonify({"error": "Missing resumes or job_description"}), 400
+        if mode not in SCORING_MODES:
+            return jsonify({"error": f"Unknown mode: {mode}"}), 400
+        too_large = check_batch_size(resumes)
+        if too_large:
+            return too_large
+
+        use_sse = (request.args.get("format") == "sse"
+                   or request.accept_mimetypes.best == "text/event-stream")
+        resumes = [resume for resume in resumes if resume.get("text", "")]
+        jd_data = extract_jd_profile(jd_text)
+
+    except HTTPException:
+        # e.g. 413 for an oversized body
+        raise
+    except Exception as e:
+        logging.exception(f"{request.endpoint} request failed")
+        ERRORS.inc(stage="request_score_stream")
+        return jsonify({"error": str(e)}), 500
+
+    def encode(record):
+        line = json.dumps(record)
+        return f"data: {line}\n\n" if use_sse else line + "\n"
+
+    def generate():
+        started = time.time()
+        scored = 0
+        errors = 0
+        scores = iter_scored_resumes([resume["text"] for resume in resumes], jd_text,
+                                     jd_data=jd_data, mode=mode, return_exceptions=True)
+        for index, result in scores:
+            resume = resumes[index]
+            if isinstance(result, Exception):
+                errors += 1
+                record = {"type": "error", "error": str(result)}
+            else:
+                scored += 1
+                record = {"type": "result", **result}
+            record["id"] = resume.get("id")
+            record["filename"] = resume.get("filename")
+            yield encode(record)
+
+        STAGE_SECONDS.observe(time.time() - started, stage="score_stream_total")
+        yield encode({
+            "type": "summary",
+            "total": len(resumes),
+            "scored": scored,
+            "errors": errors,
+            "elapsed_ms": round((time.time() - started) * 1000)
+        })
+
+    mimetype = "text/event-stream" if use_sse else "application/x-ndjson"
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/rank", methods=["POST"])
+def rank():
+    # Top-K candidates for a JD using the NLP scorer (no LLM calls). Each
+    # resume is either parsed fields under "data" or raw "text" to parse.
+    # With "min_shared_skills", only candidates sharing that many skills with
+    # the JD are scored.
+    try:
+        data = request.get_json()
+
+        resumes = data.get("resumes", [])
+        jd_text = data.get("job_description", "")
+        top_k, invalid = int_field(data, "top_k", default=20)
+        g.log_fields.update(resumes=len(resumes), jd_chars=len(jd_text), top_k=top_k)
+
+        if not resumes or not jd_text:
+            return jsonify({"error": "Missing resumes or job_description"}), 400
+        if invalid:
+            return invalid
+        min_shared, invalid = int_field(data, "min_shared_skills", minimum=0)
+        if invalid:
+            return invalid
+        too_large = check_batch_size(resumes)
+        if too_large:
+            return too_large
+
+        resumes = [resume for resume in resumes if resume.get("data") or resume.get("text")]
+        resumes_data = [resume.get("data") or extract_structured_data_from_text(resume["text"])
+                        for resume in resumes]
+        total = len(resumes)
+
+        prefilter = None
+        if min_shared is not None:
+            shortlist, prefilter = prefilter_by_skills(
+                [resume_data.get("skills", []) for resume_data in resumes_data], jd_text, min_shared)
+            resumes = [resumes[index] for index in shortlist]
+            resumes_data = [resumes_data[index] for index in shortlist]
+
+        results = []
+        for index, score, details in rank_resumes_against_job(resumes_data, jd_text, top_k):
+            results.append({
+                "id": resumes[index].get("id"),
+                "filename": resumes[index].get("filename"),
+                **details
+            })
+
+        g.log_fields.update(scored=len(resumes), returned=len(results))
+        response = {"results": results, "total": total, "top_k": top_k}
+        if prefilter is not None:
+            response["prefilter"] = prefilter
+        return jsonify(response)
+
+    except HTTPException:
+        # e.g. 413 for an oversized body
+        raise
+    except Exception as e:
+        logging.exception(f"{request.endpoint} request failed")
+        ERRORS.inc(stage="request_rank")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/match", methods=["POST"])
+def match():
+    # Many JDs against one resume pool with the NLP scorer (no LLM calls).
+    # Resumes are parsed once and shared by every JD. Each resume is parsed
+    # fields under "data" or raw "text"; each JD is {"id", "text"} or a
+    # string. Returns the M x N score matrix, or the top_k resumes per JD
+    # when "top_k" is given.
+    try:
+        data = request.get_json()
+
+        resumes = data.get("resumes", [])
+        job_descriptions = [jd if isinstance(jd, dict) else {"text": jd}
+                            for jd in data.get("job_descriptions", [])]
+        top_k, invalid = int_field(data, "top_k")
+        g.log_fields.update(resumes=len(resumes), job_descriptions=len(job_descriptions), top_k=top_k)
+
+        if not resumes or not job_descriptions:
+            return jsonify({"error": "Missing resumes or job_descriptions"}), 400
+        if invalid:
+            return invalid
+        too_large = check_batch_size(resumes)
+        if too_large:
+            return too_large
+        if len(job_descriptions) > MAX_JOB_DESCRIPTIONS_PER_REQUEST:
+            return jsonify({"error": f"Too many job descriptions (max {MAX_JOB_DESCRIPTIONS_PER_REQUEST} per request)"}), 413
+
+        resumes = [resume for resume in resumes if resume.get("data") or resume.get("text")]
+        resumes_data = [resume.get("data") or extract_structured_data_from_text(resume["text"])
+                        for resume in resumes]
+        jd_texts = [jd.get("text", "") for jd in job_descriptions]
+
+        if top_k is None:
+            return jsonify({
+                "job_ids": [jd.get("id") for jd in job_descriptions],
+                "resume_ids": [resume.get("id") for resume in resumes],
+                "scores": score_matrix(resumes_data, jd_texts).tolist()
+            })
+
+        results = []
+        for jd, ranked in zip(job_descriptions, rank_matrix(resumes_data, jd_texts, top_k)):
+            results.append({
+                "job_id": jd.get("id"),
+                "results": [{
+                    "id": resumes[index].get("id"),
+                    "filename": resumes[index].get("filename"),
+                    **details
+                } for index, score, details in ranked]
+            })
+        return jsonify({"results": results, "total": len(resumes), "top_k": top_k})
+
+    except HTTPException:
+        # e.g. 413 for an oversized body
+        raise
+    except Exception as e:
+        logging.exception(f"{request.endpoint} request failed")
+        ERRORS.inc(stage="request_match")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/explain", methods=["POST"])
+def explain():
+    # Opt-in agent explanation for a single resume, separate from scoring.
+    # The crew runs on the bounded explanation pool (EXPLAIN_WORKERS), so a
+    # burst of /explain calls queues there instead of tying up more crews,
+    # and the request gives up after EXPLAIN_TIMEOUT_SECONDS.
+    try:
+        data = request.get_json()
+        resume_text = data.get("resume", {}).get("text", "")
+        jd_text = data.get("job_description", "")
+        g.log_fields.update(resume_chars=len(resume_text), jd_chars=len(jd_text))
+
+        if not resume_text or not jd_text:
+            return jsonify({"error": "Missing resume or job_description"}), 400
+
+        future = explain_resume_async(resume_text, jd_text)
+        try:
+            explanation = future.result(timeout=EXPLAIN_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            # Drops the job if it is still queued; a running crew finishes in the background
+            future.cancel()
+            ERRORS.inc(stage="explain_timeout")
+            return jsonify({"error": f"Explanation timed out after {EXPLAIN_TIMEOUT_SECONDS:g}s"}), 504
+
+        return jsonify({
+            "id": data.get("resume", {}).get("id"),
+            "explanation": explanation
+        })
 
+    except HTTPException:
+        # e.g. 413 for an oversized body
+        raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logging.exception(f"{request.endpoint} request failed")
+        ERRORS.inc(stage="request_explain")
         return jsonify({"error": str(e)}), 500
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000, debug=True)
+    # Development server; production runs under gunicorn (see gunicorn.conf.py).
+    # The debugger and reloader are opt-in with FLASK_DEBUG=1.
+    logging.basicConfig(level=logging.INFO, force=True)
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "8000")), debug=os.getenv("FLASK_DEBUG") == "1")
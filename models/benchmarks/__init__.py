@@ -0,0 +1 @@
+# Microbenchmarks for the parsing and scoring hot paths (see benchmarks/run.py)
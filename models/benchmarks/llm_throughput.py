@@ -0,0 +1,95 @@
+"""
+Throughput of LLM-backed scoring against the offline StubLLM
+
+Run from the models/ directory:
+
+    python -m benchmarks.llm_throughput --resumes 200 --latency-ms 50 --rate 20
+    python -m benchmarks.llm_throughput --resumes 200 --error-rate 0.2
+
+A synthetic batch is scored with llm_score.score_resumes, so every resume
+goes through the shared _score_executor pool, and every stub call through
+the process-wide TokenBucket and retry_with_backoff. --error-rate makes that
+fraction of stub attempts fail with a transient 503, which exercises the
+retries and their backoff; resumes whose retries run out fall back to the
+regex extraction. The settings are passed to llm_score through its
+environment variables, so they must be set before it is imported.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def run(resumes, latency_ms, rate, burst, concurrency, error_rate, max_retries, seed):
+    """
+    Score a synthetic batch against the stub and collect throughput stats
+
+    Returns:
+        dict: Timings, attempt/error counts and the throughput ceiling
+    """
+    os.environ.update({
+        "LLM_BACKEND": "stub",
+        "LLM_STUB_LATENCY_MS": str(latency_ms),
+        "LLM_STUB_ERROR_RATE": str(error_rate),
+        "LLM_RATE_PER_SEC": str(rate),
+        "LLM_BURST": str(burst),
+        "LLM_MAX_RETRIES": str(max_retries),
+        "SCORE_CONCURRENCY": str(concurrency),
+        # Every resume must reach the stub, not a cache from an earlier run
+        "LLM_CACHE_PATH": "",
+    })
+    import llm_score
+    from utils.metrics import LLM_FALLBACKS, STAGE_SECONDS
+
+    corpus = SyntheticCorpus(seed)
+    jd_text, _ = corpus.job_descriptions(1)[0]
+    texts = [text for text, _, _ in corpus.resumes(resumes)]
+
+    started = time.perf_counter()
+    results = llm_score.score_resumes(texts, jd_text)
+    elapsed = time.perf_counter() - started
+
+    counts = llm_score.stub_llm_counts()
+    # Without errors each resume is one stub call, so calls per second are
+    # capped by both the token bucket and concurrency / latency
+    ceiling = min(rate if rate > 0 else float("inf"), concurrency / (latency_ms / 1000 or 1e-9))
+    return {
+        "resumes": len(results),
+        "seconds": round(elapsed, 3),
+        "resumes_per_sec": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+        "attempts": counts["attempts"],
+        "injected_errors": counts["errors"],
+        "retries": counts["attempts"] - (len(results) + 1),
+        "fallbacks": sum(LLM_FALLBACKS.snapshot().values()),
+        "extraction_p50_s": STAGE_SECONDS.quantile(0.5, stage="resume_extraction"),
+        "extraction_p99_s": STAGE_SECONDS.quantile(0.99, stage="resume_extraction"),
+        "ceiling_per_sec": round(ceiling, 2),
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark LLM-backed scoring against the stub LLM")
+    arg_parser.add_argument("--resumes", type=int, default=100)
+    arg_parser.add_argument("--latency-ms", type=float, default=50)
+    arg_parser.add_argument("--rate", type=float, default=20, help="LLM_RATE_PER_SEC (0 disables the limiter)")
+    arg_parser.add_argument("--burst", type=float, default=5, help="LLM_BURST")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="SCORE_CONCURRENCY")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0,
+                            help="Fraction of stub attempts that fail with a transient error")
+    arg_parser.add_argument("--max-retries", type=int, default=3, help="LLM_MAX_RETRIES")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    stats = run(args.resumes, args.latency_ms, args.rate, args.burst, args.concurrency,
+                args.error_rate, args.max_retries, args.seed)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
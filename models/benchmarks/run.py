@@ -0,0 +1,192 @@
+"""
+Microbenchmarks for the parsing and scoring hot paths
+
+Run from the models/ directory:
+
+    python -m benchmarks.run --sizes 10,100,1000
+    python -m benchmarks.run --sizes 1000 --nlp off --save benchmarks/baseline.json
+    python -m benchmarks.run --sizes 1000 --nlp off --compare benchmarks/baseline.json
+
+benchmarks/baseline.json is a reference run (see its "meta" for the
+machine); timings only compare within one machine, so save a local
+baseline before comparing changes.
+
+Every benchmark runs over a seeded synthetic corpus, with spaCy on and/or
+off. --save writes the results as a baseline; --compare reports the ratio
+to a saved baseline and exits non-zero when any benchmark got slower than
+the threshold.
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import SyntheticCorpus
+from utils import parser, profile_scorer, scorer
+from utils.nlp_models import get_nlp
+
+
+def _clear_caches():
+    """Drop per-document caches so every repeat measures a cold parse"""
+    parser.find_section_headers.cache_clear()
+    parser.segment_sections.cache_clear()
+
+
+def _benchmarks(resumes, jd_text, jd_profile, docs):
+    """name -> zero-argument callable that processes the whole corpus once"""
+    texts = [text for text, _, _ in resumes]
+    parsed = [data for _, data, _ in resumes]
+    profiles = [profile for _, _, profile in resumes]
+    skills_aliases = parser.SECTION_ALIASES["skills"]
+    cleaned_jd = scorer.clean_text(jd_text)
+    cleaned_resumes = [scorer.clean_text(scorer.build_resume_text(data)) for data in parsed]
+
+    benchmarks = {
+        "extract_skills": lambda: [parser.extract_skills(doc, text) for doc, text in zip(docs, texts)],
+        "extract_section": lambda: [parser.extract_section(text, skills_aliases) for text in texts],
+        "extract_experience": lambda: [parser.extract_experience(doc, text) for doc, text in zip(docs, texts)],
+        "calculate_skills_match": lambda: [scorer.calculate_skills_match(data["skills"], cleaned_jd)
+                                           for data in parsed],
+        "calculate_content_match": lambda: [scorer.calculate_content_match(text, cleaned_jd)
+                                            for text in cleaned_resumes],
+        "end_to_end_per_pair": lambda: [
+            scorer.score_resume_against_job(parser.extract_structured_data_from_text(text), jd_text)
+            for text in texts
+        ],
+        "end_to_end_batch": lambda: scorer.score_resumes_against_job(
+            [parser.extract_structured_data_from_text(text) for text in texts], jd_text
+        ),
+        "compute_score": lambda: [profile_scorer.compute_score(profile, jd_profile) for profile in profiles],
+        "compute_scores_batch": lambda: profile_scorer.compute_scores(profiles, jd_profile).scores,
+    }
+    return benchmarks
+
+
+def _set_spacy(enabled):
+    """Switch spaCy on or off in the parser and scorer; returns False if unavailable"""
+    # Only load the model when it is about to be used
+    if enabled and not (parser.is_model_available() and get_nlp() is not None):
+        return False
+    parser.HAS_SPACY = enabled
+    scorer.HAS_SPACY = enabled
+    if parser.HAS_ML_PARSER:
+        parser.ml_parser.has_spacy = enabled
+    return True
+
+
+def run(sizes, nlp_modes, repeat, seed, only=None):
+    """
+    Run every benchmark for each corpus size and spaCy mode
+
+    Returns:
+        dict: "name|size|nlp" -> timing stats
+    """
+    corpus = SyntheticCorpus(seed)
+    jd_text, jd_profile = corpus.job_descriptions(1)[0]
+    results = {}
+
+    for nlp_mode in nlp_modes:
+        if not _set_spacy(nlp_mode == "on"):
+            print(f"⚠️ spaCy model not available, skipping nlp={nlp_mode}")
+            continue
+
+        for size in sizes:
+            resumes = corpus.resumes(size)
+            nlp = get_nlp() if nlp_mode == "on" else None
+            docs = list(nlp.pipe(text for text, _, _ in resumes)) if nlp else [None] * size
+
+            for name, func in _benchmarks(resumes, jd_text, jd_profile, docs).items():
+                if only and name not in only:
+                    continue
+                timings = []
+                for _ in range(repeat):
+                    _clear_caches()
+                    start = time.perf_counter()
+                    func()
+                    timings.append(time.perf_counter() - start)
+
+                median = statistics.median(timings)
+                key = f"{name}|{size}|{nlp_mode}"
+                results[key] = {
+                    "median_s": round(median, 6),
+                    "min_s": round(min(timings), 6),
+                    "per_doc_us": round(median / size * 1e6, 2),
+                    "docs_per_sec": round(size / median, 1) if median > 0 else None,
+                }
+                print(f"{key:45s} {results[key]['per_doc_us']:>12.2f} µs/doc "
+                      f"{results[key]['docs_per_sec'] or 0:>12.1f} docs/sec")
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratio of each result to the baseline
+
+    Returns:
+        list: Keys that got slower than 1 + threshold
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline:
+            continue
+        ratio = result["median_s"] / baseline[key]["median_s"] if baseline[key]["median_s"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  ❌ regression"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = "  ✅ faster"
+        print(f"{key:45s} {ratio:>6.2f}x baseline{flag}")
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark the parsing and scoring hot paths")
+    arg_parser.add_argument("--sizes", default="10,100,1000",
+                            help="Comma-separated corpus sizes (10 to 100000)")
+    arg_parser.add_argument("--nlp", choices=["on", "off", "both"], default="both",
+                            help="Run with spaCy, without it, or both")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--only", default=None, help="Comma-separated benchmark names")
+    arg_parser.add_argument("--save", default=None, help="Write results to this baseline file")
+    arg_parser.add_argument("--compare", default=None, help="Compare against this baseline file")
+    arg_parser.add_argument("--threshold", type=float, default=0.2,
+                            help="Relative slowdown that counts as a regression")
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    nlp_modes = ["on", "off"] if args.nlp == "both" else [args.nlp]
+    only = set(args.only.split(",")) if args.only else None
+
+    results = run(sizes, nlp_modes, args.repeat, args.seed, only)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "seed": args.seed,
+                    "repeat": args.repeat,
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"💾 Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import random
+
+from utils.parser import load_expanded_skills
+
+FIRST_NAMES = ["Aarav", "Priya", "John", "Maria", "Wei", "Fatima", "Liam", "Sofia", "Kenji", "Amara"]
+LAST_NAMES = ["Sharma", "Smith", "Garcia", "Chen", "Khan", "Okafor", "Rossi", "Tanaka", "Muller", "Silva"]
+TITLES = ["Software Engineer", "Data Analyst", "Product Manager", "DevOps Engineer", "UX Designer",
+          "Machine Learning Engineer", "Backend Developer", "Consultant", "Project Manager"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+VERBS = ["Developed", "Designed", "Led", "Implemented", "Managed", "Created", "Built", "Worked on"]
+OBJECTS = ["a data pipeline", "the billing platform", "customer dashboards", "a recommendation service",
+           "internal tooling", "the mobile app", "CI/CD workflows", "reporting for the sales team"]
+OUTCOMES = ["reducing latency by 30%", "serving 2M users", "cutting costs by 15%",
+            "improving conversion", "with a team of five engineers", "across three regions"]
+DEGREES = ["Bachelor of Technology in Computer Science", "Master of Science in Data Science",
+           "Bachelor of Engineering", "MBA", "PhD in Statistics"]
+FILLER = ["the", "and", "with", "for", "our", "team", "company", "product", "customers", "work",
+          "fast", "growing", "strong", "experience", "environment", "collaborative", "ownership"]
+
+
+class SyntheticCorpus:
+    """
+    Seeded generator of synthetic resumes and job descriptions
+
+    The same seed always yields the same documents, so benchmark runs are
+    comparable. Each document is seeded by its position, so a smaller
+    corpus is a prefix of a larger one. Each resume is available as raw
+    text (for the parser), as parsed data (for scorer.py) and as an
+    LLM-style profile (for utils.profile_scorer.compute_score).
+    """
+
+    def __init__(self, seed=42):
+        self.seed = seed
+        self.skills = sorted(load_expanded_skills())
+
+    def resumes(self, count):
+        """List of (text, parsed_data, profile) tuples"""
+        return [self._resume(random.Random(f"{self.seed}-resume-{i}")) for i in range(count)]
+
+    def job_descriptions(self, count):
+        """List of (text, profile) tuples"""
+        return [self._job_description(random.Random(f"{self.seed}-jd-{i}")) for i in range(count)]
+
+    def _resume(self, rng):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        email = name.lower().replace(" ", ".") + "@example.com"
+        phone = f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+        skills = rng.sample(self.skills, rng.randint(5, 15))
+        years = rng.randint(0, 20)
+        degree = rng.choice(DEGREES)
+
+        experience = []
+        for _ in range(rng.randint(1, 4)):
+            bullets = [
+                f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}, {rng.choice(OUTCOMES)}."
+                for _ in range(rng.randint(2, 5))
+            ]
+            experience.append((f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}", bullets))
+
+        lines = [name, f"{email} | {phone}", "",
+                 "SUMMARY", f"{rng.choice(TITLES)} with {years} years of experience. "
+                 + " ".join(rng.choices(FILLER, k=20)) + ".", "",
+                 "SKILLS", ", ".join(skills), "",
+                 "EXPERIENCE"]
+        for title, bullets in experience:
+            lines.append(title)
+            lines.extend(f"• {bullet}" for bullet in bullets)
+        lines += ["", "EDUCATION", degree, ""]
+
+        data = {
+            "name": name,
+            "email": email,
+            "phone": phone,
+            "skills": skills,
+            "experience": [bullet for _, bullets in experience for bullet in bullets],
+        }
+        profile = {"skills": skills, "experience": years, "education": degree}
+        return "\n".join(lines), data, profile
+
+    def _job_description(self, rng):
+        skills = rng.sample(self.skills, rng.randint(4, 10))
+        years = rng.randint(0, 10)
+        degree = rng.choice(DEGREES).split(" in ")[0]
+        text = (
+            f"We are hiring a {rng.choice(TITLES)} at {rng.choice(COMPANIES)}. "
+            + " ".join(rng.choices(FILLER, k=30)) + ". "
+            + f"Requirements: {years}+ years of experience with {', '.join(skills)}. "
+            + f"Education: {degree}. "
+            + f"You will {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)} {rng.choice(OUTCOMES)}."
+        )
+        return text, {"skills": skills, "experience": years, "education": degree}
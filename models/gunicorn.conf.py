@@ -0,0 +1,74 @@
+# Production server for the model API:
+#
+#     gunicorn -c gunicorn.conf.py app:app
+#
+# The app and its models (spaCy, the skills classifier, the LLM client) are
+# loaded once in the master and shared copy-on-write by the forked workers.
+# Settings can be overridden with the environment variables below or on the
+# command line. Note that per-process state (LLM rate limiter, in-memory
+# caches) is per worker: divide LLM_RATE_PER_SEC by the worker count to stay
+# within the provider quota. /metrics is summed over the workers through the
+# files in METRICS_MULTIPROC_DIR (a fresh temp directory by default).
+import gc
+import multiprocessing
+import os
+import tempfile
+
+# Set before the app (and utils.metrics) is imported; an empty value turns
+# the shared totals off
+if "METRICS_MULTIPROC_DIR" not in os.environ:
+    os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="neohire-metrics-")
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+# Threads let one worker keep streaming /score/stream while serving others
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# LLM-backed scoring of a large batch can take a while
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
+
+preload_app = True
+
+# Small request lines and headers; body size is capped by MAX_REQUEST_MB in app.py
+limit_request_line = 8190
+limit_request_fields = 100
+limit_request_field_size = 8190
+
+loglevel = os.getenv("LOG_LEVEL", "info")
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Runs in the master after the app is imported, before any worker forks
+    import logging
+    from app import preload_models
+    from utils.metrics import clear_process_metrics
+
+    logging.basicConfig(level=loglevel.upper(), force=True)
+    # Totals start from zero with every server start
+    clear_process_metrics()
+    preload_models()
+    # Keep the garbage collector from touching (and so copying) the
+    # preloaded objects in every worker
+    gc.freeze()
+
+
+def worker_exit(server, worker):
+    # Runs in the exiting worker: save the requests since its last save
+    from utils.metrics import save_process_metrics
+
+    save_process_metrics()
+
+
+def child_exit(server, worker):
+    # Runs in the master: fold the exited worker's metrics into one file, so
+    # workers recycled by max_requests don't leave a file each behind
+    from utils.metrics import collect_exited_process
+
+    collect_exited_process(worker.pid)
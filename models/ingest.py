@@ -0,0 +1,267 @@
+"""
+Bulk resume ingestion
+
+Parses a directory (or manifest) of PDF, DOCX and JSON resumes with
+utils.parser.extract_resume_data in a process pool and streams the records
+to JSONL or Parquet. Completed and failed files are recorded in a
+checkpoint file, so an interrupted run picks up where it stopped when
+started again with the same arguments; --retry-failed also parses the
+files that failed before (their new records are appended, so the last
+record for a path wins).
+
+    python ingest.py resumes/ -o parsed.jsonl --workers 8
+    python ingest.py manifest.txt -o parsed_parquet --format parquet
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'json')
+# Checkpoint lines with this prefix are files whose parse failed
+FAILED_PREFIX = "failed\t"
+# A file that was in flight this many times when a worker process died is
+# recorded as failed instead of being retried again
+MAX_POOL_CRASHES = 2
+
+
+def _init_worker():
+    """Load spaCy and the skills classifier once per worker process"""
+    # Importing the parser loads the skills classifier; spaCy is lazy, so warm it up
+    from utils import parser
+    from utils.nlp_models import get_nlp
+    if parser.HAS_SPACY:
+        get_nlp()
+
+
+def _parse_chunk(paths):
+    """Parse a chunk of resume files (runs in a worker process)"""
+    from utils.parser import extract_resume_data
+
+    records = []
+    for path in paths:
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        try:
+            records.append({"path": path, "data": extract_resume_data(path, extension), "error": None})
+        except Exception as e:
+            records.append({"path": path, "data": None, "error": str(e)})
+    return records
+
+
+def list_inputs(source):
+    """
+    List resume files from a directory (recursively) or a manifest file
+
+    A manifest is either one path per line or JSONL with a "path" field;
+    relative paths are resolved against the manifest's directory.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().rsplit('.', 1)[-1] in SUPPORTED_EXTENSIONS:
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, 'r') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line:
+                continue
+            path = json.loads(line)["path"] if line.startswith('{') else line
+            paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+    return paths
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Paths recorded by previous runs
+
+    Returns:
+        tuple: (set of parsed paths, set of paths whose last parse failed)
+    """
+    done, failed = set(), set()
+    if not os.path.exists(checkpoint_path):
+        return done, failed
+    with open(checkpoint_path, 'r') as checkpoint:
+        for line in checkpoint:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            if line.startswith(FAILED_PREFIX):
+                failed.add(line[len(FAILED_PREFIX):])
+            else:
+                done.add(line)
+                failed.discard(line)
+    return done, failed
+
+
+class JSONLWriter:
+    """Append records to a JSONL file"""
+
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, records):
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Write each chunk of records as a part file in an output directory"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.part = len([name for name in os.listdir(path) if name.endswith('.parquet')])
+
+    def write(self, records):
+        table = self.pa.table({
+            "path": [record["path"] for record in records],
+            # Resume fields vary (JSON resumes are free-form), so keep them as JSON text
+            "data": [json.dumps(record["data"], ensure_ascii=False) if record["data"] is not None else None
+                     for record in records],
+            "error": [record["error"] for record in records],
+        })
+        self.pq.write_table(table, os.path.join(self.path, f"part-{self.part:05d}.parquet"))
+        self.part += 1
+
+    def close(self):
+        pass
+
+
+def ingest(source, output, output_format='jsonl', workers=None, chunk_size=32, checkpoint_path=None,
+           retry_failed=False):
+    """
+    Parse every resume under source and write the records to output
+
+    Files listed in the checkpoint are skipped (failed ones only without
+    retry_failed); each chunk's paths are added to the checkpoint only
+    after its records are written and synced, so a crash can at worst
+    re-emit the chunk that was in flight. If a worker process dies, the
+    pool is restarted and the chunks in flight are parsed again one file
+    at a time; a file in flight for MAX_POOL_CRASHES crashes is recorded
+    as failed.
+
+    Returns:
+        dict: Counts of parsed, failed and skipped files, pool restarts and docs/sec
+    """
+    workers = workers or os.cpu_count() or 1
+    checkpoint_path = checkpoint_path or output.rstrip('/\\') + '.checkpoint'
+
+    done, failed = load_checkpoint(checkpoint_path)
+    skip = done if retry_failed else done | failed
+    pending = [path for path in list_inputs(source) if path not in skip]
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    print(f"📂 {len(pending)} files to parse ({len(done)} already done, {len(failed)} failed before), "
+          f"{len(chunks)} chunks on {workers} workers")
+
+    writer = ParquetWriter(output) if output_format == 'parquet' else JSONLWriter(output)
+    stats = {"parsed": 0, "failed": 0, "skipped": len(skip), "pool_restarts": 0}
+    started = time.time()
+
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    def write(records):
+        writer.write(records)
+        checkpoint.write("".join((FAILED_PREFIX if record["error"] else "") + record["path"] + "\n"
+                                 for record in records))
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+        for record in records:
+            stats["failed" if record["error"] else "parsed"] += 1
+
+    # (chunk, crashes) still to submit; crashes counts pool breaks the chunk was in flight for
+    queue = deque((chunk, 0) for chunk in chunks)
+    in_flight = {}
+    executor = new_pool()
+    try:
+        with open(checkpoint_path, 'a') as checkpoint:
+            while True:
+                # Keep a bounded number of chunks queued so memory stays flat
+                while len(in_flight) < workers * 2 and queue:
+                    chunk, crashes = queue.popleft()
+                    in_flight[executor.submit(_parse_chunk, chunk)] = (chunk, crashes)
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken = any(isinstance(future.exception(), BrokenProcessPool) for future in finished)
+                if broken:
+                    # Every other chunk in flight fails with the pool too
+                    finished = wait(in_flight).done
+                for future in finished:
+                    chunk, crashes = in_flight.pop(future)
+                    if not isinstance(future.exception(), BrokenProcessPool):
+                        write(future.result())
+                    elif len(chunk) > 1:
+                        queue.extendleft(([path], crashes) for path in reversed(chunk))
+                    elif crashes + 1 < MAX_POOL_CRASHES:
+                        queue.appendleft((chunk, crashes + 1))
+                    else:
+                        write([{"path": chunk[0], "data": None, "error": "Worker process crashed"}])
+
+                if broken:
+                    logging.warning("A worker process died; restarting the pool")
+                    stats["pool_restarts"] += 1
+                    executor.shutdown(wait=True)
+                    executor = new_pool()
+
+                processed = stats["parsed"] + stats["failed"]
+                elapsed = time.time() - started
+                print(f"⏱️ {processed}/{len(pending)} files, {processed / max(elapsed, 1e-9):.1f} docs/sec")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+
+    elapsed = time.time() - started
+    processed = stats["parsed"] + stats["failed"]
+    stats["seconds"] = round(elapsed, 2)
+    stats["docs_per_sec"] = round(processed / elapsed, 2) if elapsed > 0 else 0.0
+    print(f"✅ Parsed {stats['parsed']}, failed {stats['failed']}, skipped {stats['skipped']} "
+          f"in {stats['seconds']}s ({stats['docs_per_sec']} docs/sec)")
+    return stats
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Bulk-parse resumes to JSONL or Parquet")
+    arg_parser.add_argument("source", help="Directory of resumes or a manifest file")
+    arg_parser.add_argument("-o", "--output", required=True,
+                            help="JSONL file, or directory of part files for Parquet")
+    arg_parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--chunk-size", type=int, default=32, help="Files per task sent to a worker")
+    arg_parser.add_argument("--checkpoint", default=None,
+                            help="Checkpoint file (default: <output>.checkpoint)")
+    arg_parser.add_argument("--retry-failed", action="store_true",
+                            help="Parse files that failed in a previous run again")
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    ingest(args.source, args.output, args.format, args.workers, args.chunk_size, args.checkpoint,
+           args.retry_failed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
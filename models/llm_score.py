@@ -1,6 +1,12 @@
 # Import necessary modules
 from crewai import Agent, Task, Crew, Process
-from typing import Dict, List
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import hashlib
+import random
+import threading
+import time
 import os
 from langchain.llms.base import LLM
 from pydantic import PrivateAttr
@@ -8,12 +14,33 @@ import google.generativeai as genai
 import re
 from dotenv import load_dotenv
 import json
+from utils.llm_cache import LLMCache
+from utils.rate_limit import TokenBucket, is_transient_error, retry_with_backoff
+from utils.profile_scorer import ScoreBatch, compute_score, compute_scores
+from utils.resume_record import ResumeRecord
+from utils.metrics import CACHE_HITS, CACHE_MISSES, ERRORS, LLM_CALLS, LLM_FALLBACKS, STAGE_SECONDS
 
 # Load environment variables from .env file
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key=GEMINI_API_KEY)
 
+# Provider quota shared by every thread in the process (requests per second)
+llm_rate_limiter = TokenBucket(
+    rate=float(os.getenv("LLM_RATE_PER_SEC", "5")),
+    capacity=float(os.getenv("LLM_BURST", "5"))
+)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+# Wrap a model request with the rate limiter and retries with backoff. Only
+# transient errors (429, 5xx, timeouts, connection drops) are retried; auth,
+# invalid-request and blocked-response errors are raised straight away
+def _call_with_limits(generate):
+    def attempt():
+        llm_rate_limiter.acquire()
+        return generate()
+    return retry_with_backoff(attempt, max_retries=LLM_MAX_RETRIES, retry_if=is_transient_error)
+
 # Custom Gemini LLM class using LangChain's base LLM
 class GeminiLLM(LLM):
     model_name: str = "gemini/gemini-2.0-flash"
@@ -26,11 +53,10 @@ class GeminiLLM(LLM):
 
     def _call(self, prompt: str, stop: List[str] = None) -> str:
         # Generate a response from Gemini model
-        response = self._client.generate_content(
+        return _call_with_limits(lambda: self._client.generate_content(
             prompt,
             generation_config={"temperature": self.temperature, "stop_sequences": stop if stop else None}
-        )
-        return response.text
+        ).text)
 
     @property
     def _llm_type(self) -> str:
@@ -40,30 +66,150 @@ class GeminiLLM(LLM):
     def _identifying_params(self) -> Dict[str, any]:
         return {"model_name": self.model_name, "temperature": self.temperature}
 
-# Initialize LLM instance
-llm = GeminiLLM()
+# Transient provider error raised by StubLLM (retried like a Gemini 503)
+class StubTransientError(Exception):
+    code = 503
+
+# StubLLM attempts (retries included) and injected errors in this process
+_stub_counts = {"attempts": 0, "errors": 0}
+_stub_counts_lock = threading.Lock()
+
+def stub_llm_counts() -> Dict[str, int]:
+    with _stub_counts_lock:
+        return dict(_stub_counts)
+
+# Offline stand-in for Gemini with a fixed latency, for throughput and latency
+# tests; error_rate is the fraction of attempts that fail with a transient error
+class StubLLM(LLM):
+    model_name: str = "stub"
+    latency: float = 0.2
+    error_rate: float = 0.0
+    skills_vocabulary: List[str] = ["Python", "Java", "JavaScript", "SQL", "React", "Docker",
+                                    "AWS", "Kubernetes", "Machine Learning", "Flask"]
+
+    def _call(self, prompt: str, stop: List[str] = None) -> str:
+        return _call_with_limits(lambda: self._respond(prompt))
+
+    def _respond(self, prompt: str) -> str:
+        time.sleep(self.latency)
+        failed = random.random() < self.error_rate
+        with _stub_counts_lock:
+            _stub_counts["attempts"] += 1
+            _stub_counts["errors"] += failed
+        if failed:
+            raise StubTransientError("Stub provider unavailable (injected)")
+        # Only look at the document part of extraction prompts
+        text = prompt.split("Text: ", 1)[-1].split("\n\nReturn", 1)[0]
+        experience = re.search(r'(\d+)\+?\s+years?', text, re.IGNORECASE)
+        education = re.search(r"\b(bachelor|master|phd|b\.?tech|m\.?tech)\w*", text, re.IGNORECASE)
+        return json.dumps({
+            "skills": [skill for skill in self.skills_vocabulary
+                       if re.search(r'\b' + re.escape(skill) + r'\b', text, re.IGNORECASE)],
+            "experience": int(experience.group(1)) if experience else 0,
+            "education": education.group(0) if education else ""
+        })
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    @property
+    def _identifying_params(self) -> Dict[str, any]:
+        return {"model_name": self.model_name, "latency": self.latency}
+
+# Initialize LLM instance (LLM_BACKEND=stub runs offline against StubLLM)
+if os.getenv("LLM_BACKEND", "gemini") == "stub":
+    llm = StubLLM(latency=float(os.getenv("LLM_STUB_LATENCY_MS", "200")) / 1000,
+                  error_rate=float(os.getenv("LLM_STUB_ERROR_RATE", "0")))
+else:
+    llm = GeminiLLM()
+
+# Content-addressed cache of LLM extractions (memory LRU + SQLite on disk).
+# The SQLite file lives next to this module unless LLM_CACHE_PATH says
+# otherwise; set it to an empty string to keep the cache in memory only.
+# Profiles are held in memory as ResumeRecords, which share interned skill
+# names and compare skills as bitsets.
+llm_cache = LLMCache(
+    path=os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.sqlite3")) or None,
+    max_memory_items=int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "1024")),
+    max_disk_items=int(os.getenv("LLM_CACHE_DISK_ITEMS", "100000")),
+    max_disk_bytes=int(float(os.getenv("LLM_CACHE_DISK_MB", "256")) * 1024 * 1024),
+    max_age_seconds=float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600,
+    compact=ResumeRecord.from_dict
+)
+
+# Ask the LLM for structured data; raises if the call or the JSON parsing fails
+def _llm_extract(text: str, prompt: str) -> Dict:
+    key = LLMCache.make_key(llm.model_name, prompt, text)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        CACHE_HITS.inc(cache="llm")
+        return cached
+    CACHE_MISSES.inc(cache="llm")
+
+    full_prompt = f"{prompt}\n\nText: {text}\n\nReturn a JSON-like dictionary with 'skills' (list), 'experience' (int), and 'education' (str)."
+    LLM_CALLS.inc(prompt=prompt)
+    with STAGE_SECONDS.time(stage="llm_call"):
+        response = llm._call(full_prompt)
+    data = json.loads(response)
+    result = {
+        "skills": data.get("skills", []),
+        "experience": int(data.get("experience", 0)),
+        "education": data.get("education", "")
+    }
+
+    # Only successful LLM answers are cached, never the regex fallback
+    return llm_cache.set(key, result)
+
+# Fallback regex-based extraction in case LLM fails
+def _regex_extract(text: str) -> Dict:
+    skills = re.findall(r'skills?:? ([\w\s,]+)', text, re.IGNORECASE)
+    experience = re.findall(r'experience:? (\d+)', text, re.IGNORECASE)
+    education = re.findall(r'education:? ([\w\s]+)', text, re.IGNORECASE)
+    return {
+        "skills": skills[0].split(', ') if skills else [],
+        "experience": int(experience[0]) if experience else 0,
+        "education": education[0] if education else ""
+    }
 
 # Function to extract structured data from resume or JD using LLM
 def extract_with_llm(text: str, prompt: str) -> Dict:
-    full_prompt = f"{prompt}\n\nText: {text}\n\nReturn a JSON-like dictionary with 'skills' (list), 'experience' (int), and 'education' (str)."
     try:
-        response = llm._call(full_prompt)
-        data = json.loads(response)
-        return {
-            "skills": data.get("skills", []),
-            "experience": int(data.get("experience", 0)),
-            "education": data.get("education", "")
-        }
+        return _llm_extract(text, prompt)
     except Exception:
-        # Fallback regex-based extraction in case LLM fails
-        skills = re.findall(r'skills?:? ([\w\s,]+)', text, re.IGNORECASE)
-        experience = re.findall(r'experience:? (\d+)', text, re.IGNORECASE)
-        education = re.findall(r'education:? ([\w\s]+)', text, re.IGNORECASE)
-        return {
-            "skills": skills[0].split(', ') if skills else [],
-            "experience": int(experience[0]) if experience else 0,
-            "education": education[0] if education else ""
-        }
+        ERRORS.inc(stage="llm_extract")
+        LLM_FALLBACKS.inc(prompt=prompt)
+        return _regex_extract(text)
+
+# JD profiles kept across requests, keyed by a hash of the JD text (LRU order)
+JD_PROFILE_CACHE_SIZE = int(os.getenv("JD_PROFILE_CACHE_SIZE", "256"))
+_jd_profiles: "OrderedDict[str, Dict]" = OrderedDict()
+_jd_profiles_lock = threading.Lock()
+
+# Extract a JD once and reuse the profile for every resume scored against it
+def extract_jd_profile(jd_text: str) -> Dict:
+    key = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+    with _jd_profiles_lock:
+        if key in _jd_profiles:
+            _jd_profiles.move_to_end(key)
+            CACHE_HITS.inc(cache="jd_profile")
+            return _jd_profiles[key]
+    CACHE_MISSES.inc(cache="jd_profile")
+
+    try:
+        jd_data = _llm_extract(jd_text, "Extract JD details")
+    except Exception:
+        ERRORS.inc(stage="llm_extract")
+        LLM_FALLBACKS.inc(prompt="Extract JD details")
+        # Don't cache the regex fallback so the next request retries the LLM
+        return _regex_extract(jd_text)
+
+    with _jd_profiles_lock:
+        _jd_profiles[key] = jd_data
+        _jd_profiles.move_to_end(key)
+        while len(_jd_profiles) > JD_PROFILE_CACHE_SIZE:
+            _jd_profiles.popitem(last=False)
+    return jd_data
 
 # Define agents with specific roles and goals
 resume_parser = Agent(
@@ -114,47 +260,16 @@ def match_task(resume_data: Dict, jd_data: Dict) -> Task:
         expected_output='A score (0-100) with an explanation.'
     )
 
-# Custom logic to compute score between resume and JD
-def compute_score(resume_data: Dict, jd_data: Dict) -> Dict:
-    resume_skills = set(resume_data["skills"])
-    jd_skills = set(jd_data["skills"])
-    
-    # Skills match scoring (max 50 points)
-    skill_match = len(resume_skills.intersection(jd_skills)) / len(jd_skills) if jd_skills else 0
-    skills_score = skill_match * 50
-
-    # Experience match scoring (max 30 points)
-    exp_match = min(resume_data["experience"] / jd_data["experience"], 1.0) if jd_data["experience"] > 0 else 1.0
-    exp_score = exp_match * 30
-
-    # Education match scoring (max 20 points)
-    edu_match = 1.0 if jd_data["education"].lower() in resume_data["education"].lower() else 0.5
-    edu_score = edu_match * 20
-
-    # Final total score
-    total_score = min(round(skills_score + exp_score + edu_score, 2), 100)
-    
-    # Generate a readable explanation
-    final_answer = (
-        f"# Agent: Matcher\n"
-        f"## Final Answer:\n"
-        f"The compatibility score is {total_score}. "
-        f"The candidate possesses relevant skills like {', '.join(resume_skills.intersection(jd_skills)) or 'none specified'}, "
-        f"and their {resume_data['education']} aligns with the job's educational requirements. "
-        f"The candidate's experience exceeds the minimum requirements which is a plus. "
-        f"The skills score is {'low' if skill_match < 0.5 else 'moderate to high'}."
-    )
-    
-    return {"score": total_score, "final_answer": final_answer}
+# Scoring modes: "fast" returns compute_score directly; "crew" also runs the
+# three-agent crew first (its output is not part of the score)
+SCORING_MODES = ("fast", "crew")
 
-# High-level function to score resume against a JD
-def score_resume(resume_text: str, jd_text: str) -> Dict:
-    # Extract structured data using LLM
-    resume_data = extract_with_llm(resume_text, "Extract resume details")
-    jd_data = extract_with_llm(jd_text, "Extract JD details")
+# Background pool for opt-in agent explanations
+_explain_executor = ThreadPoolExecutor(max_workers=int(os.getenv("EXPLAIN_WORKERS", "2")))
 
-    # Set up and run the Crew AI process
-    crew = Crew(
+# Build the three-agent crew for a resume/JD pair
+def build_crew(resume_text: str, jd_text: str, resume_data: Dict, jd_data: Dict) -> Crew:
+    return Crew(
         agents=[resume_parser, jd_parser, matcher],
         tasks=[
             parse_resume_task(resume_text),
@@ -165,7 +280,74 @@ def score_resume(resume_text: str, jd_text: str) -> Dict:
         verbose=True
     )
 
-    crew.kickoff()
+# High-level function to score resume against a JD
+def score_resume(resume_text: str, jd_text: str, jd_data: Optional[Dict] = None, mode: str = "fast") -> Dict:
+    if mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode: {mode}")
+
+    # Extract structured data using LLM; batch callers pass the JD profile in
+    with STAGE_SECONDS.time(stage="resume_extraction"):
+        resume_data = extract_with_llm(resume_text, "Extract resume details")
+    if jd_data is None:
+        with STAGE_SECONDS.time(stage="jd_extraction"):
+            jd_data = extract_jd_profile(jd_text)
+
+    # Set up and run the Crew AI process (legacy mode; the output is discarded)
+    if mode == "crew":
+        with STAGE_SECONDS.time(stage="crew_kickoff"):
+            build_crew(resume_text, jd_text, resume_data, jd_data).kickoff()
 
     # Return computed score and breakdown
-    return compute_score(resume_data, jd_data)
+    with STAGE_SECONDS.time(stage="compute_score"):
+        return compute_score(resume_data, jd_data)
+
+# Shared pool that bounds how many resumes are scored at once across all requests
+SCORE_CONCURRENCY = int(os.getenv("SCORE_CONCURRENCY", "8"))
+_score_executor = ThreadPoolExecutor(max_workers=SCORE_CONCURRENCY)
+
+# Score resumes concurrently; yields (index, result) as each one finishes.
+# With return_exceptions=True a failed resume yields its exception instead of raising.
+def iter_scored_resumes(resume_texts: List[str], jd_text: str, jd_data: Optional[Dict] = None,
+                        mode: str = "fast", return_exceptions: bool = False):
+    if jd_data is None:
+        jd_data = extract_jd_profile(jd_text)
+
+    futures = {
+        _score_executor.submit(score_resume, resume_text, jd_text, jd_data, mode): index
+        for index, resume_text in enumerate(resume_texts)
+    }
+    try:
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                ERRORS.inc(stage="score_resume")
+            if error is not None and not return_exceptions:
+                raise error
+            yield futures[future], error if error is not None else future.result()
+    finally:
+        # Don't keep scoring for a caller that has gone away
+        for future in futures:
+            future.cancel()
+
+# Score resumes concurrently and return the results in input order
+def score_resumes(resume_texts: List[str], jd_text: str, jd_data: Optional[Dict] = None,
+                  mode: str = "fast") -> List[Dict]:
+    results = [None] * len(resume_texts)
+    for index, result in iter_scored_resumes(resume_texts, jd_text, jd_data, mode):
+        results[index] = result
+    return results
+
+# Opt-in agent-generated explanation for a resume/JD pair
+def explain_resume(resume_text: str, jd_text: str, resume_data: Optional[Dict] = None,
+                   jd_data: Optional[Dict] = None) -> str:
+    if resume_data is None:
+        resume_data = extract_with_llm(resume_text, "Extract resume details")
+    if jd_data is None:
+        jd_data = extract_jd_profile(jd_text)
+
+    return str(build_crew(resume_text, jd_text, resume_data, jd_data).kickoff())
+
+# Run explain_resume in the background; returns a Future with the explanation
+def explain_resume_async(resume_text: str, jd_text: str, resume_data: Optional[Dict] = None,
+                         jd_data: Optional[Dict] = None) -> Future:
+    return _explain_executor.submit(explain_resume, resume_text, jd_text, resume_data, jd_data)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The model server imports its modules relative to models/ (e.g. `from utils...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+import os
+
+from utils.candidate_index import CandidateIndex
+
+
+def resume(*skills):
+    return {"name": "", "email": "", "phone": "", "skills": list(skills),
+            "experience": [f"Built services with {', '.join(skills)}"], "education": "BSc Computer Science"}
+
+
+def ranked_ids(index, job_description):
+    return [candidate_id for candidate_id, _ in index.rank(job_description)]
+
+
+def test_add_remove_and_compact(tmp_path):
+    index = CandidateIndex(str(tmp_path), n_features=2 ** 12, auto_compact_rows=0)
+    index.add_many([("a", resume("Python", "Django")), ("b", resume("Java", "Spring")), ("c", resume("Python"))])
+    assert len(index) == 3 and index.get_skills("a") == ["Django", "Python"]
+    assert ranked_ids(index, "Python Django developer")[0] == "a"
+
+    index.compact()
+    index.remove("a")
+    index.add("b", resume("Python", "Django"))
+    assert "a" not in index and len(index) == 2
+    assert ranked_ids(index, "Python Django developer")[0] == "b"
+
+    before = index.rank("Python Django developer")
+    index.compact()
+    assert index.rank("Python Django developer") == before
+
+
+def test_instances_see_each_others_writes(tmp_path):
+    first = CandidateIndex(str(tmp_path), n_features=2 ** 12, auto_compact_rows=0)
+    first.add_many([("a", resume("Python")), ("b", resume("Java"))])
+    second = CandidateIndex(str(tmp_path), n_features=2 ** 12, auto_compact_rows=0)
+    assert ranked_ids(second, "Python") == ranked_ids(first, "Python")
+
+    # Compaction by one instance must not leave the other ranking nothing
+    first.compact()
+    first.add("c", resume("Go"))
+    assert sorted(ranked_ids(second, "Python Java Go")) == ["a", "b", "c"]
+
+    # A compaction from the stale instance builds on the newer generation
+    second.compact()
+    first.compact()
+    assert sorted(ranked_ids(first, "Python Java Go")) == ["a", "b", "c"]
+    assert sorted(ranked_ids(second, "Python Java Go")) == ["a", "b", "c"]
+    first.close()
+    second.close()
+
+    reopened = CandidateIndex(str(tmp_path), n_features=2 ** 12)
+    assert len(reopened) == 3 and reopened.get("c")["skills"] == ["Go"]
+    assert sorted(ranked_ids(reopened, "Python Java Go")) == ["a", "b", "c"]
+    # Only the current and previous base generations are kept
+    assert len([name for name in os.listdir(str(tmp_path)) if name.endswith(".data.npy")]) == 2
+
+
+def test_shortlist_keeps_the_scorers_best_candidates(tmp_path):
+    from utils.scorer import rank_resumes_against_job
+
+    candidates = {"a": resume("Python", "Django", "PostgreSQL"), "b": resume("Java", "Spring"),
+                  "c": resume("Python"), "d": resume("React", "CSS")}
+    job_description = "Python Django developer with PostgreSQL"
+    index = CandidateIndex(str(tmp_path), n_features=2 ** 12, auto_compact_rows=0)
+    index.add_many(candidates.items())
+
+    # The index only approximates content match, so compare orderings, not scores
+    ids = list(candidates)
+    full = [ids[i] for i, _, _ in rank_resumes_against_job(list(candidates.values()), job_description, 2)]
+    shortlist = [candidate_id for candidate_id, _ in index.rank(job_description, top_k=2)]
+    assert sorted(shortlist) == sorted(full)
+    rescored = rank_resumes_against_job([candidates[i] for i in shortlist], job_description, 1)
+    assert shortlist[rescored[0][0]] == full[0]
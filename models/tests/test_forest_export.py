@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from utils.forest_export import FlatForest, export_forest
+
+
+def test_flat_forest_matches_sklearn(tmp_path):
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 6, size=(600, 14)).astype(float)
+    X[:, 0] = rng.rand(600) * 40
+    y = ((X[:, 0] > 12) ^ (X[:, 3] > 2) ^ (rng.rand(600) < 0.1)).astype(int)
+    model = RandomForestClassifier(n_estimators=25, max_depth=10, random_state=42, n_jobs=1).fit(X, y)
+
+    export_forest(model, str(tmp_path / "forest"))
+    forest = FlatForest.load(str(tmp_path / "forest"))
+    assert isinstance(forest.value, np.memmap)
+
+    X_test = rng.randint(0, 6, size=(2000, 14)).astype(float)
+    X_test[:, 0] = rng.rand(2000) * 40
+    np.testing.assert_array_equal(forest.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(forest.predict(X_test), model.predict(X_test))
+
+
+def test_reexport_leaves_loaded_forest_intact(tmp_path):
+    rng = np.random.RandomState(1)
+    X = rng.rand(400, 14)
+    y = (X[:, 0] + X[:, 1] > 1).astype(int)
+    path = str(tmp_path / "forest")
+    old_model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0, n_jobs=1).fit(X, y)
+    export_forest(old_model, path)
+    old_forest = FlatForest.load(path)
+
+    # Retrain on other data and re-export over the live artifact, twice
+    for seed in (1, 2):
+        new_model = RandomForestClassifier(n_estimators=30, max_depth=12, random_state=seed, n_jobs=1)
+        new_model.fit(X, rng.randint(0, 2, size=400))
+        export_forest(new_model, path)
+
+    np.testing.assert_array_equal(old_forest.predict_proba(X), old_model.predict_proba(X))
+    np.testing.assert_array_equal(FlatForest.load(path).predict_proba(X), new_model.predict_proba(X))
+    assert len([entry for entry in os.listdir(path) if entry.startswith("v")]) == 2
@@ -0,0 +1,57 @@
+import json
+import os
+
+import ingest
+
+_parse_chunk = ingest._parse_chunk
+
+
+def _crash_on_poison(paths):
+    # Stands in for a parser crash that takes the worker process down
+    if any("poison" in path for path in paths):
+        os._exit(1)
+    return _parse_chunk(paths)
+
+
+def write_resume(directory, name):
+    (directory / name).write_text(json.dumps({"name": name, "skills": ["Python"], "experience": []}))
+
+
+def test_resume_and_retry_failed(tmp_path):
+    source = tmp_path / "resumes"
+    source.mkdir()
+    write_resume(source, "a.json")
+    (source / "b.json").write_text("{not json")
+    output = str(tmp_path / "parsed.jsonl")
+
+    stats = ingest.ingest(str(source), output, workers=1)
+    assert (stats["parsed"], stats["failed"]) == (1, 1)
+
+    # A rerun skips both files; failed files are parsed again only on request
+    write_resume(source, "c.json")
+    stats = ingest.ingest(str(source), output, workers=1)
+    assert (stats["parsed"], stats["failed"], stats["skipped"]) == (1, 0, 2)
+
+    write_resume(source, "b.json")
+    stats = ingest.ingest(str(source), output, workers=1, retry_failed=True)
+    assert (stats["parsed"], stats["failed"], stats["skipped"]) == (1, 0, 2)
+
+    done, failed = ingest.load_checkpoint(output + ".checkpoint")
+    assert done == {str(source / name) for name in ("a.json", "b.json", "c.json")} and not failed
+    with open(output) as f:
+        assert [os.path.basename(json.loads(line)["path"]) for line in f] == ["a.json", "b.json", "c.json", "b.json"]
+
+
+def test_pool_restarts_after_a_worker_dies(tmp_path, monkeypatch):
+    source = tmp_path / "resumes"
+    source.mkdir()
+    for name in ("a.json", "b.json", "poison.json", "d.json"):
+        write_resume(source, name)
+    output = str(tmp_path / "parsed.jsonl")
+
+    monkeypatch.setattr(ingest, "_parse_chunk", _crash_on_poison)
+    stats = ingest.ingest(str(source), output, workers=1, chunk_size=4)
+
+    assert (stats["parsed"], stats["failed"]) == (3, 1) and stats["pool_restarts"] >= 1
+    done, failed = ingest.load_checkpoint(output + ".checkpoint")
+    assert failed == {str(source / "poison.json")} and len(done) == 3
@@ -0,0 +1,25 @@
+from utils import scorer
+from utils.scorer import JobTermIndex
+
+
+def test_scores_follow_substring_matches(monkeypatch):
+    monkeypatch.setattr(scorer, "HAS_SPACY", False)
+    text = "javascript and python developer, python preferred"
+    index = JobTermIndex(text)
+
+    # "java" matches inside "javascript", as the per-resume scan did
+    assert index.score("Java") == 0.7 * (1 / 3) + 0.3
+    assert index.score("python") == 0.7 * (2 / 3) + 0.3 * (1 - text.find("python") / len(text))
+    assert index.score("Rust") == 0
+    assert 0 < index.score("developer python") < 1
+
+
+def test_score_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(scorer, "HAS_SPACY", False)
+    monkeypatch.setattr(scorer, "JOB_TERM_SCORE_CACHE_SIZE", 10)
+    index = JobTermIndex("python developer")
+
+    for i in range(50):
+        index.score(f"skill {i}")
+    assert len(index._scores) == 10
+    assert index.score("skill 49") == index.score("skill 49")
@@ -0,0 +1,76 @@
+from utils.llm_cache import LLMCache
+
+
+def test_key_depends_on_model_prompt_and_text():
+    key = LLMCache.make_key("gemini", "Extract resume details", "text")
+
+    assert key == LLMCache.make_key("gemini", "Extract resume details", "text")
+    assert key != LLMCache.make_key("other-model", "Extract resume details", "text")
+    assert key != LLMCache.make_key("gemini", "Extract JD details", "text")
+    assert key != LLMCache.make_key("gemini", "Extract resume details", "text2")
+
+
+def test_memory_lru_eviction_and_counters():
+    cache = LLMCache(max_memory_items=2)
+    cache.set("a", {"skills": ["Python"]})
+    cache.set("b", {"skills": []})
+    cache.get("a")
+    cache.set("c", {"skills": []})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"skills": ["Python"]}
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    LLMCache(path=path).set("key", {"experience": 3})
+
+    cache = LLMCache(path=path)
+
+    assert cache.get("key") == {"experience": 3}
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("key") == {"experience": 3}
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), max_age_seconds=-1)
+    cache.set("key", {"experience": 3})
+
+    assert cache.get("key") is None
+
+
+def test_disk_eviction_by_size(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), max_memory_items=1,
+                     max_disk_items=2, prune_every=1)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "b"
+    assert cache.get("c") == "c"
+
+
+def test_memory_tier_holds_compacted_values(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMCache(path=path, compact=tuple)
+
+    assert cache.set("key", ["Python", "SQL"]) == ("Python", "SQL")
+    assert cache.get("key") == ("Python", "SQL")
+    assert LLMCache(path=path, compact=tuple).get("key") == ("Python", "SQL")
+    assert LLMCache(path=path).get("key") == ["Python", "SQL"]
+
+
+def test_disk_tier_is_bounded_by_bytes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMCache(path=path, max_memory_items=1, max_disk_bytes=250, prune_every=1)
+    for key in "abcd":
+        cache.set(key, {"education": key * 100})
+
+    cache = LLMCache(path=path)
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") is not None and cache.get("d") is not None
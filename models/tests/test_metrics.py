@@ -0,0 +1,64 @@
+import json
+
+from utils.metrics import EXITED_FILE, Counter, Histogram, collect_exited_process, render_prometheus
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram("test_latency_seconds", "Test latency", ["stage"], buckets=(0.1, 1.0, 10.0),
+                          registry=[])
+    for value in [0.05] * 50 + [0.5] * 49 + [5.0]:
+        histogram.observe(value, stage="parse")
+
+    text = "\n".join(histogram.render())
+    assert 'test_latency_seconds_bucket{stage="parse",le="0.1"} 50' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="+Inf"} 100' in text
+    assert 'test_latency_seconds_count{stage="parse"} 100' in text
+    assert histogram.quantile(0.5, stage="parse") == 0.1
+    assert histogram.quantile(0.99, stage="parse") == 1.0
+    assert 1.0 < histogram.quantile(0.999, stage="parse") <= 10.0
+    assert histogram.quantile(0.5, stage="missing") is None
+
+
+def test_counter_and_exposition():
+    registry = []
+    counter = Counter("test_events_total", "Test events", ["kind"], registry=registry)
+    counter.inc(kind="hit")
+    counter.inc(2, kind="hit")
+
+    assert counter.value(kind="hit") == 3
+    assert 'test_events_total{kind="hit"} 3' in render_prometheus(registry=registry)
+    assert "test_events_total" not in render_prometheus()
+
+
+def test_render_sums_process_files(tmp_path):
+    registry = []
+    counter = Counter("test_jobs_total", "Test jobs", ["kind"], registry=registry)
+    histogram = Histogram("test_job_seconds", "Test job time", buckets=(1.0,), quantiles=(), registry=registry)
+    counter.inc(2, kind="a")
+    histogram.observe(0.5)
+    # Another worker's saved state
+    (tmp_path / "4242-1.json").write_text(json.dumps({
+        "test_jobs_total": [[["a"], 3], [["b"], 1]],
+        "test_job_seconds": [[[], [1, 2.0, 1]]],
+    }))
+
+    text = render_prometheus(str(tmp_path), registry)
+    assert 'test_jobs_total{kind="a"} 5' in text
+    assert 'test_jobs_total{kind="b"} 1' in text
+    assert "test_job_seconds_count 2" in text and "test_job_seconds_sum 2.5" in text
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_exited_workers_are_folded_into_one_file(tmp_path):
+    registry = []
+    Counter("test_tasks_total", "Test tasks", registry=registry)
+    for pid, count in ((4242, 3), (4343, 4)):
+        (tmp_path / f"{pid}-1.json").write_text(json.dumps({"test_tasks_total": [[[], count]]}))
+
+    before = render_prometheus(str(tmp_path), registry)
+    collect_exited_process(4242, str(tmp_path), registry)
+    collect_exited_process(4343, str(tmp_path), registry)
+
+    assert "test_tasks_total 7" in before
+    assert render_prometheus(str(tmp_path), registry) == before
+    assert not list(tmp_path.glob("4*.json")) and (tmp_path / EXITED_FILE).exists()
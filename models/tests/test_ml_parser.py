@@ -0,0 +1,44 @@
+import os
+
+from utils.ml_parser import MLResumeParser
+
+EXAMPLES = ([(skill, True) for skill in ["Python", "SQL", "Docker", "AWS", "React", "CI/CD"] * 5] +
+            [(text, False) for text in ["led the team", "worked with clients", "managed delivery",
+                                        "responsible for sales", "improved results", "met deadlines"] * 5])
+
+
+def test_training_holds_out_a_split_and_caches_features(tmp_path):
+    parser = MLResumeParser()
+    parser.model_path = str(tmp_path / "skills_classifier.joblib")
+    parser.forest_path = str(tmp_path / "skills_classifier.forest")
+
+    first = parser.train_skills_classifier(EXAMPLES, cache_dir=str(tmp_path / "cache"), n_jobs=1)
+    assert first["n_test"] == 12 and first["n_train"] == 48
+    assert not first["feature_cache_hit"]
+    assert set(first["timings"]) == {"features", "split", "training", "evaluation", "save", "export"}
+    assert os.path.exists(parser.model_path)
+
+    second = parser.train_skills_classifier(EXAMPLES, cache_dir=str(tmp_path / "cache"), n_jobs=1)
+    assert second["feature_cache_hit"]
+    assert second["accuracy"] == first["accuracy"]
+
+
+class FailingPipeline:
+    """spaCy stand-in whose pipe dies partway through"""
+    meta = {"name": "core_web_sm", "version": "0.0"}
+    pipe_names = []
+
+    def pipe(self, texts, **kwargs):
+        raise RuntimeError("worker died")
+
+
+def test_fallback_features_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(MLResumeParser, "nlp", property(lambda self: FailingPipeline()))
+    parser = MLResumeParser()
+    parser.has_spacy = True
+    texts = [text for text, _ in EXAMPLES]
+
+    features, hit = parser._cached_features(texts, cache_dir=str(tmp_path))
+    assert not hit and features.shape[0] == len(texts)
+    assert os.listdir(str(tmp_path)) == []
+    assert not parser._cached_features(texts, cache_dir=str(tmp_path))[1]
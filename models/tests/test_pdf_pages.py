@@ -0,0 +1,32 @@
+import logging
+
+from utils import parser
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+
+def fake_reader(texts):
+    class Reader:
+        def __init__(self, file):
+            self.pages = [FakePage(text) for text in texts]
+    return Reader
+
+
+def test_byte_cap_logs_truncation_only_when_text_is_dropped(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"")
+    monkeypatch.setattr(parser.PyPDF2, "PdfReader", fake_reader(["ab", "cd"]))
+
+    with caplog.at_level(logging.WARNING):
+        assert parser.extract_text_from_pdf(str(path), max_bytes=6, workers=1) == "ab\ncd\n"
+    assert "truncated" not in caplog.text
+
+    with caplog.at_level(logging.WARNING):
+        assert parser.extract_text_from_pdf(str(path), max_bytes=3, workers=1) == "ab\n"
+    assert "truncated at 3 bytes" in caplog.text
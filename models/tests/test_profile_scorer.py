@@ -0,0 +1,40 @@
+import random
+
+from utils.profile_scorer import compute_score, compute_scores
+from utils.resume_record import ResumeRecord, SkillVocabulary
+
+SKILLS = ["Python", "SQL", "Docker", "AWS", "React", "Java", "Go", "Kafka"]
+EDUCATIONS = ["", "Bachelor of Science", "B.Tech", "Master of Engineering", "PhD in Physics"]
+
+
+def _profile(rng, max_experience=15):
+    return {
+        "skills": rng.sample(SKILLS, rng.randint(0, len(SKILLS))) + rng.choice([[], ["Python"]]),
+        "experience": rng.randint(0, max_experience),
+        "education": rng.choice(EDUCATIONS),
+    }
+
+
+def test_batch_matches_per_pair():
+    rng = random.Random(0)
+    for _ in range(50):
+        jd = _profile(rng, max_experience=rng.choice([0, 3, 7, 2 ** 60]))
+        resumes = [_profile(rng, max_experience=rng.choice([15, 2 ** 70])) for _ in range(200)]
+        batch = compute_scores(resumes, jd)
+        assert [batch[i] for i in range(len(resumes))] == [compute_score(resume, jd) for resume in resumes]
+
+
+def test_batch_matches_per_pair_for_records():
+    rng = random.Random(1)
+    vocabulary = SkillVocabulary(SKILLS)
+    jd = ResumeRecord.from_dict(_profile(rng), vocabulary)
+    resumes = [ResumeRecord.from_dict(_profile(rng), vocabulary) for _ in range(200)]
+    batch = compute_scores(resumes, jd)
+    assert list(batch) == [compute_score(resume, jd) for resume in resumes]
+
+
+def test_top_k_best_first_with_stable_ties():
+    jd = {"skills": ["Python", "SQL"], "experience": 2, "education": ""}
+    resumes = [{"skills": skills, "experience": 2, "education": ""}
+               for skills in (["SQL"], ["Python", "SQL"], [], ["Python"])]
+    assert compute_scores(resumes, jd).top_k(3) == [1, 0, 3]
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from utils.rate_limit import TokenBucket, is_transient_error, retry_with_backoff
+
+
+def test_token_bucket_limits_sustained_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    # The first token is free, the other five wait 1/50s each
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+
+def test_token_bucket_allows_burst():
+    bucket = TokenBucket(rate=1, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+
+    assert time.monotonic() - start < 0.5
+
+
+def test_retry_with_backoff_recovers():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("quota exceeded")
+        return "ok"
+
+    assert retry_with_backoff(flaky, max_retries=3, base_delay=0.001) == "ok"
+    assert len(calls) == 3
+
+
+def test_retry_with_backoff_gives_up():
+    def failing():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        retry_with_backoff(failing, max_retries=2, base_delay=0.001)
+
+
+class StatusError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def test_transient_errors():
+    assert is_transient_error(StatusError(429)) and is_transient_error(StatusError(503))
+    assert is_transient_error(TimeoutError()) and is_transient_error(ConnectionResetError())
+    assert not is_transient_error(StatusError(400)) and not is_transient_error(StatusError(403))
+    assert not is_transient_error(ValueError("response was blocked"))
+
+
+def test_retry_if_raises_permanent_errors_at_once():
+    calls = []
+
+    def unauthorized():
+        calls.append(1)
+        raise StatusError(401)
+
+    with pytest.raises(StatusError):
+        retry_with_backoff(unauthorized, max_retries=3, base_delay=0.001, retry_if=is_transient_error)
+    assert len(calls) == 1
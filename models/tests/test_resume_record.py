@@ -0,0 +1,41 @@
+from utils.resume_record import ResumeRecord, SkillVocabulary, popcount
+from utils.scorer import score_resume_against_job
+
+
+def test_vocabulary_interns_and_learns():
+    vocabulary = SkillVocabulary(["SQL", "Python", "Docker"])
+    assert [vocabulary.id_of(skill) for skill in ["Docker", "Python", "SQL"]] == [0, 1, 2]
+
+    mask = vocabulary.encode(["SQL", "Rust", "SQL"])
+    assert vocabulary.id_of("Rust") == 3 and vocabulary.base_size == 3
+    assert vocabulary.decode(mask) == ["SQL", "Rust"]
+    assert popcount(mask & vocabulary.encode(["Rust", "Docker"])) == 1
+
+
+def test_record_reads_like_the_dict():
+    vocabulary = SkillVocabulary(["Python", "SQL"])
+    data = {"name": "Jane Doe", "email": "jane@example.com", "phone": "",
+            "skills": ["Python", "Kafka"], "experience": ["Built data pipelines in Python"]}
+    record = ResumeRecord.from_dict(data, vocabulary)
+
+    assert record.to_dict() == data
+    assert record["skills"] == ["Python", "Kafka"]
+    assert record.get("education", "n/a") == "n/a"
+    assert record.shared_skills(ResumeRecord(["Kafka", "SQL"], vocabulary=vocabulary)) == 1
+    assert score_resume_against_job(record, "Python and Kafka engineer") == \
+        score_resume_against_job(data, "Python and Kafka engineer")
+
+
+def test_record_keeps_skill_order_and_caps_the_vocabulary():
+    # "Kafka" is learned after the seeded "Python" but sorts before it
+    vocabulary = SkillVocabulary(["Python"], max_size=2)
+    record = ResumeRecord(["Python", "Kafka", "Rust"], vocabulary=vocabulary)
+
+    assert record["skills"] == ["Python", "Kafka", "Rust"]
+    assert len(vocabulary) == 2 and vocabulary.id_of("Rust") is None
+    assert record.unknown_skills == {"Rust"}
+    assert record.skill_count == 3
+    assert record.shared_skills(ResumeRecord(["Rust", "Kafka"], vocabulary=vocabulary)) == 2
+
+    empty = SkillVocabulary()
+    assert ResumeRecord(["Go"], vocabulary=empty).vocabulary is empty
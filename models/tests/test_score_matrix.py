@@ -0,0 +1,58 @@
+from utils.scorer import (rank_matrix, rank_resumes_against_job, score_matrix, score_resume_against_job,
+                          score_resumes_against_job)
+
+RESUMES = [
+    {"name": "A", "skills": ["Python", "SQL"], "experience": ["Built Python ETL pipelines on SQL databases"]},
+    {"name": "B", "skills": ["React", "CSS"], "experience": ["Frontend work with React"]},
+    {"name": "C", "skills": ["Python", "Docker"], "experience": []},
+]
+JOBS = ["Python developer with SQL experience", "Frontend engineer (React, CSS)"]
+
+
+def test_single_job_matches_batch_scoring():
+    assert score_matrix(RESUMES, JOBS[:1])[0].tolist() == \
+        [score for score, _ in score_resumes_against_job(RESUMES, JOBS[0])]
+    assert rank_matrix(RESUMES, JOBS[:1], 2)[0] == rank_resumes_against_job(RESUMES, JOBS[0], 2)
+
+
+def test_matrix_shape_and_ranking():
+    scores = score_matrix(RESUMES, JOBS)
+    assert scores.shape == (2, 3)
+    assert [ranked[0][0] for ranked in rank_matrix(RESUMES, JOBS, 1)] == [0, 1]
+
+
+def test_batch_scores_equal_per_resume_scores():
+    # IDF is per (resume, JD) pair, so neither the batch nor the other resumes change a score
+    for job in JOBS:
+        batch = [score for score, _ in score_resumes_against_job(RESUMES, job)]
+        assert batch == [score_resume_against_job(resume, job)[0] for resume in RESUMES]
+        assert [score for score, _ in score_resumes_against_job(RESUMES[:1], job)] == batch[:1]
+
+
+def test_ranking_builds_details_only_for_kept_candidates(monkeypatch):
+    from utils import scorer
+
+    expected = sorted(((index, score, details) for index, (score, details)
+                       in enumerate(score_resumes_against_job(RESUMES, JOBS[0]))),
+                      key=lambda entry: (-entry[1], entry[0]))[:2]
+    built = []
+    score_details = scorer.score_details
+    monkeypatch.setattr(scorer, "score_details", lambda *args: built.append(args) or score_details(*args))
+
+    assert rank_resumes_against_job(RESUMES, JOBS[0], 2) == expected
+    assert len(built) == 2
+
+
+def test_content_match_counts_shared_terms(monkeypatch):
+    # Pins the scores after max_df/max_features were dropped from content
+    # match (before, every per-pair content cosine was 0); spaCy off so the
+    # numbers don't depend on the installed model
+    from utils import scorer
+
+    monkeypatch.setattr(scorer, "HAS_SPACY", False)
+    resume_texts = [scorer.clean_text(scorer.build_resume_text(resume)) for resume in RESUMES]
+    content = scorer.calculate_content_match_batch(resume_texts, scorer.clean_text(JOBS[0]))
+    assert [round(float(score), 4) for score in content] == [16.3914, 0.0, 9.6533]
+    assert round(scorer.calculate_content_match(resume_texts[0], scorer.clean_text(JOBS[0])), 4) == 16.3914
+    assert [[score for score, _ in score_resumes_against_job(RESUMES, job)] for job in JOBS] == \
+        [[32, 0, 29], [0, 32, 0]]
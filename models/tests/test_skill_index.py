@@ -0,0 +1,46 @@
+from utils.skill_index import SkillIndex, normalize_skill
+
+
+def build_index():
+    index = SkillIndex()
+    index.add("a", ["Python", "SQL", "Docker"])
+    index.add("b", ["python", "React"])
+    index.add("c", ["Java"])
+    return index
+
+
+def test_normalize_skill():
+    assert normalize_skill("  Machine   Learning ") == "machine learning"
+
+
+def test_prefilter_by_shared_skills():
+    index = build_index()
+
+    assert index.prefilter(["PYTHON", "sql"], min_shared=1) == ["a", "b"]
+    assert index.prefilter(["Python", "SQL"], min_shared=2) == ["a"]
+    assert index.prefilter(["Rust"], min_shared=1) == []
+
+    stats = index.last_stats
+    assert stats["pool"] == 3
+    assert stats["shortlist"] == 0
+    assert stats["indexed_jd_skills"] == 0
+
+
+def test_incremental_updates():
+    index = build_index()
+    index.add("b", ["Java"])
+    index.remove("a")
+
+    assert index.prefilter(["Python"]) == []
+    assert sorted(index.prefilter(["Java"])) == ["b", "c"]
+    assert "python" not in index.postings
+    assert index.last_stats["selectivity"] == 1.0
+    assert not index.remove("a")
+    assert "a" not in index.prefilter(["Python", "SQL", "Docker"], min_shared=0)
+    assert index.get_skills("b") == ["java"]
+
+
+def test_min_shared_zero_keeps_everyone():
+    index = build_index()
+
+    assert sorted(index.prefilter(["Python"], min_shared=0)) == ["a", "b", "c"]
@@ -0,0 +1,55 @@
+import re
+
+from utils.skill_matcher import SkillMatcher
+
+SKILLS = ["Python", "Java", "JavaScript", "Ruby", "Ruby on Rails", "SQL", "Spark SQL",
+          "Machine Learning", "Node.js", ".NET Core", "C++", "Git", "GitHub"]
+
+
+def per_skill_search(text):
+    """Reference behaviour: one case-insensitive word-bounded search per skill"""
+    return {
+        skill for skill in SKILLS
+        if re.search(r'\b' + re.escape(skill) + r'\b', text, re.IGNORECASE)
+    }
+
+
+def test_matches_per_skill_search():
+    matcher = SkillMatcher(SKILLS)
+    texts = [
+        "Built APIs in python and JAVASCRIPT, deployed with git.",
+        "Ruby on Rails, Spark SQL and machine learning pipelines",
+        "Worked on node.js services; moved from .NET Core to C++11",
+        "javanese scripts, Pythonic code and GitHubber tooling",
+        "",
+    ]
+    for text in texts:
+        assert matcher.find_skills(text) == per_skill_search(text)
+
+
+def test_reports_overlapping_positions():
+    matcher = SkillMatcher(SKILLS)
+    text = "Ruby on Rails and Spark SQL"
+
+    hits = matcher.find_all(text)
+
+    assert ("Ruby on Rails", 0, 13) in hits
+    assert ("Ruby", 0, 4) in hits
+    assert ("Spark SQL", 18, 27) in hits
+    assert ("SQL", 24, 27) in hits
+    for skill, start, end in hits:
+        assert text[start:end].lower() == skill.lower()
+
+
+def test_empty_vocabulary():
+    assert SkillMatcher([]).find_all("Python") == []
+
+
+def test_case_insensitive_matches_outside_lower():
+    # IGNORECASE matches long s, dotted capital I and the Kelvin sign, but
+    # their lower() is not the stored key
+    matcher = SkillMatcher(SKILLS + ["Swift", "Linux", "Kotlin"])
+    text = "Shipped \u017fwift apps on L\u0130nux and \u212aotlin services"
+
+    assert matcher.find_skills(text) == {"Swift", "Linux", "Kotlin"}
+    assert ("Linux", 22, 27) in matcher.find_all(text)
@@ -0,0 +1,74 @@
+"""
+Train the skills classifier used by the resume parser
+
+Reads labelled examples from a CSV file (columns text,is_skill) or JSONL
+({"text": ..., "is_skill": ...}) and trains utils.ml_parser's
+RandomForest, reporting held-out metrics and the wall-clock time of each
+stage. Feature matrices are cached, so retraining on the same examples
+skips spaCy.
+
+    python train_skills.py labelled_skills.csv
+    python train_skills.py labelled_skills.jsonl --test-size 0.1 --n-process 4
+"""
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+
+
+def load_examples(path):
+    """(text, is_skill) pairs from a CSV or JSONL file"""
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith(('.jsonl', '.json')):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    examples.append((record["text"], bool(record["is_skill"])))
+        else:
+            for row in csv.DictReader(f):
+                examples.append((row["text"], str(row["is_skill"]).strip().lower() in TRUE_VALUES))
+    return examples
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Train the skills classifier")
+    arg_parser.add_argument("examples", help="CSV (text,is_skill) or JSONL file of labelled examples")
+    arg_parser.add_argument("--test-size", type=float, default=0.2, help="Held-out fraction (0 to disable)")
+    arg_parser.add_argument("--n-jobs", type=int, default=-1, help="Cores for training (-1 for all)")
+    arg_parser.add_argument("--n-process", type=int, default=1, help="spaCy processes for feature extraction")
+    arg_parser.add_argument("--batch-size", type=int, default=256, help="Texts per nlp.pipe batch")
+    arg_parser.add_argument("--cache-dir", default=None,
+                            help="Feature cache directory (empty string to disable)")
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    from utils.ml_parser import MLResumeParser
+
+    started = time.perf_counter()
+    examples = load_examples(args.examples)
+    load_seconds = time.perf_counter() - started
+    print(f"📂 {len(examples)} examples ({sum(1 for _, label in examples if label)} skills)")
+
+    parser = MLResumeParser()
+    metrics = parser.train_skills_classifier(
+        examples, test_size=args.test_size, n_jobs=args.n_jobs, cache_dir=args.cache_dir,
+        batch_size=args.batch_size, n_process=args.n_process
+    )
+
+    print(f"⏱️ load {load_seconds:.3f}s, " +
+          ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in metrics["timings"].items()) +
+          (" (features from cache)" if metrics["feature_cache_hit"] else ""))
+    print(f"✅ accuracy {metrics['accuracy']:.4f}, precision {metrics['precision']:.4f}, "
+          f"recall {metrics['recall']:.4f}, f1 {metrics['f1']:.4f} "
+          f"({metrics['n_train']} train / {metrics['n_test']} held out)")
+    print(f"💾 Saved model to {parser.model_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from utils.scorer import build_resume_text, clean_text
+
+
+class CandidateIndex:
+    """
+    On-disk store of parsed candidates for ranking new job descriptions
+
+    Each candidate's parsed fields and skills live in SQLite next to a
+    hashed term-count vector of its resume text, so a new JD is ranked
+    without reparsing or revectorizing anyone. Vectors are kept in two
+    segments:
+
+    - a base segment: CSR arrays saved as .npy files and memory-mapped
+      read-only, so worker processes share one copy through the page cache;
+    - a delta segment: vectors added since the last compaction, stored as
+      blobs in SQLite.
+
+    Removing a base candidate only marks it deleted; compact() folds the
+    delta in and drops deleted rows by writing a new base generation.
+    Several instances (or processes) can share one directory: each notices
+    commits made by the others and reloads its view before ranking.
+    Terms are hashed (no fitted vocabulary), and IDF weights are computed at
+    query time from document frequencies over the live candidates, so adds
+    and removes never invalidate the stored vectors.
+
+    The ranking is an approximate, content-only prefilter: a plain TF-IDF
+    cosine of the resume text against the JD, without the spaCy keywords,
+    per-pair IDF, skill matches or experience relevance that
+    utils.scorer combines into the final score. Use it to shortlist
+    candidates from a large pool, then score the shortlist with
+    rank_resumes_against_job.
+    """
+
+    def __init__(self, path, n_features=2 ** 18, auto_compact_rows=10000):
+        self.path = path
+        self.n_features = n_features
+        self.auto_compact_rows = auto_compact_rows
+        os.makedirs(path, exist_ok=True)
+
+        # Tokenization and n-grams as in scorer.create_content_vectorizer, but
+        # hashed and without the per-pair IDF, so similarities differ from
+        # calculate_content_match
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            stop_words='english',
+            alternate_sign=False,
+            norm=None
+        )
+
+        self._lock = threading.RLock()
+        # Long timeout: compaction holds the write lock while it writes the new base
+        self._db = sqlite3.connect(os.path.join(path, 'candidates.sqlite3'), timeout=60, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "id TEXT NOT NULL, fields TEXT NOT NULL, skills TEXT NOT NULL, "
+            "segment INTEGER NOT NULL, row INTEGER, deleted INTEGER NOT NULL DEFAULT 0, "
+            "term_ids BLOB, term_counts BLOB)"
+        )
+        # A replaced base candidate keeps its deleted row until compaction
+        self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS candidates_live_id ON candidates (id) WHERE deleted = 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS candidates_segment ON candidates (segment, row)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.commit()
+
+        self._generation = int(self._meta('base_generation', '0'))
+        self._base = None
+        self._view = None
+        self._data_version = None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM candidates WHERE deleted = 0").fetchone()[0]
+
+    def __contains__(self, candidate_id):
+        return self.get(candidate_id) is not None
+
+    def add(self, candidate_id, resume_data):
+        """Add or replace one candidate (see add_many)"""
+        self.add_many([(candidate_id, resume_data)])
+
+    def add_many(self, candidates):
+        """
+        Add or replace candidates in one transaction
+
+        Args:
+            candidates (iterable): (candidate_id, resume_data) pairs, where
+                resume_data is the dict from extract_structured_data_from_text
+        """
+        candidates = list(candidates)
+        if not candidates:
+            return
+
+        texts = [clean_text(build_resume_text(data)) for _, data in candidates]
+        vectors = self.vectorizer.transform(texts).tocsr()
+
+        with self._lock:
+            for i, (candidate_id, data) in enumerate(candidates):
+                start, stop = vectors.indptr[i], vectors.indptr[i + 1]
+                self._remove_locked(str(candidate_id))
+                self._db.execute(
+                    "INSERT INTO candidates (id, fields, skills, segment, row, deleted, term_ids, term_counts) "
+                    "VALUES (?, ?, ?, 0, NULL, 0, ?, ?)",
+                    (str(candidate_id), json.dumps(data), json.dumps(sorted(set(data.get('skills', [])))),
+                     vectors.indices[start:stop].astype(np.int32).tobytes(),
+                     vectors.data[start:stop].astype(np.float32).tobytes())
+                )
+            self._db.commit()
+            self._view = None
+
+            delta_rows = self._db.execute("SELECT COUNT(*) FROM candidates WHERE segment = 0").fetchone()[0]
+            if self.auto_compact_rows and delta_rows >= self.auto_compact_rows:
+                self.compact()
+
+    def remove(self, candidate_id):
+        """Remove a candidate; returns False if it wasn't in the index"""
+        with self._lock:
+            removed = self._remove_locked(str(candidate_id))
+            self._db.commit()
+            self._view = None
+            return removed
+
+    def get(self, candidate_id):
+        """Parsed resume fields for a candidate, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fields FROM candidates WHERE id = ? AND deleted = 0", (str(candidate_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_skills(self, candidate_id):
+        """Skill list for a candidate, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT skills FROM candidates WHERE id = ? AND deleted = 0", (str(candidate_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def rank(self, job_description, top_k=None):
+        """
+        Rank every stored candidate against a job description
+
+        Computes TF-IDF cosine similarity between the JD and all candidate
+        vectors with sparse matrix-vector products over the stored segments.
+        This is a content-only approximation of the scorer (see the class
+        docstring), meant for shortlisting.
+
+        Args:
+            job_description (str): Job description text
+            top_k (int): Return only the best top_k candidates
+
+        Returns:
+            list: (candidate_id, similarity 0-100) pairs, best first
+        """
+        ids, scores = self.similarities(job_description)
+        if not len(ids):
+            return []
+
+        if top_k is not None and top_k < len(ids):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(ids))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(ids[i], float(scores[i])) for i in best]
+
+    def similarities(self, job_description):
+        """
+        Similarity of every live candidate to a job description
+
+        Returns:
+            tuple: (candidate_ids list, numpy array of similarities 0-100)
+        """
+        with self._lock:
+            view = self._get_view()
+
+        if view['count'] == 0:
+            return [], np.zeros(0)
+
+        # Smooth IDF as in sklearn's TfidfTransformer
+        idf = np.log((1 + view['count']) / (1 + view['df'])) + 1
+        query = self.vectorizer.transform([clean_text(job_description)]).tocsr()
+        weights = np.zeros(self.n_features)
+        weights[query.indices] = query.data * idf[query.indices]
+        query_norm = np.linalg.norm(weights)
+        if query_norm == 0:
+            return list(view['ids']), np.zeros(len(view['ids']))
+
+        # cos(x, q) = sum(x * idf * q_w) / (||x * idf|| * ||q_w||)
+        idf_weights = idf * weights
+        idf_squared = idf ** 2
+        scores = []
+        for matrix, squared in view['segments']:
+            dots = matrix @ idf_weights
+            norms = np.sqrt(squared @ idf_squared)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores.append(np.where(norms > 0, dots / (norms * query_norm), 0.0))
+
+        scores = np.concatenate(scores)[view['live']] * 100
+        return view['ids'], scores
+
+    def compact(self):
+        """Fold the delta segment into a new base segment and drop deleted rows"""
+        with self._lock:
+            # Take the write lock before reading the generation, so concurrent
+            # compactions run one after another instead of both writing the same files
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                generation = self._compact_locked()
+            except BaseException:
+                self._db.rollback()
+                raise
+            self._db.commit()
+
+            # Readers may still be loading the previous generation; keep it one round
+            self._delete_base_files(generation - 2)
+            self._view = None
+            logging.info(f"Compacted candidate index to generation {generation}")
+
+    def _compact_locked(self):
+        self._sync_generation()
+        base = self._load_base()
+        live_rows = [row for (row,) in self._db.execute(
+            "SELECT row FROM candidates WHERE segment = ? AND deleted = 0 ORDER BY row",
+            (self._generation,)
+        )]
+        delta_ids, delta = self._load_delta()
+
+        parts = []
+        if base is not None and live_rows:
+            parts.append(base['matrix'][live_rows])
+        if delta.shape[0]:
+            parts.append(delta)
+        matrix = sp.vstack(parts, format='csr') if parts else sp.csr_matrix((0, self.n_features))
+
+        generation = self._generation + 1
+        self._save_base(generation, matrix)
+
+        base_ids = [candidate_id for (candidate_id,) in self._db.execute(
+            "SELECT id FROM candidates WHERE segment = ? AND deleted = 0 ORDER BY row",
+            (self._generation,)
+        )] if self._generation else []
+
+        self._db.execute("DELETE FROM candidates WHERE deleted = 1")
+        self._db.executemany(
+            "UPDATE candidates SET segment = ?, row = ?, term_ids = NULL, term_counts = NULL "
+            "WHERE id = ? AND deleted = 0",
+            ((generation, row, candidate_id) for row, candidate_id in enumerate(base_ids + delta_ids))
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('base_generation', ?)", (str(generation),)
+        )
+
+        self._generation = generation
+        self._base = None
+        logging.debug(f"New base generation {generation} has {matrix.shape[0]} rows")
+        return generation
+
+    def _remove_locked(self, candidate_id):
+        row = self._db.execute("SELECT segment FROM candidates WHERE id = ? AND deleted = 0",
+                               (candidate_id,)).fetchone()
+        if row is None:
+            return False
+        if row[0] == 0:
+            self._db.execute("DELETE FROM candidates WHERE id = ? AND deleted = 0", (candidate_id,))
+        else:
+            # Base rows are immutable; mark deleted until the next compaction
+            self._db.execute("UPDATE candidates SET deleted = 1 WHERE id = ? AND deleted = 0", (candidate_id,))
+        return True
+
+    def _sync_generation(self):
+        """Pick up a base generation written by another instance"""
+        generation = int(self._meta('base_generation', '0'))
+        if generation != self._generation:
+            self._generation = generation
+            self._base = None
+            self._view = None
+
+    def _meta(self, key, default):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _base_file(self, generation, part):
+        return os.path.join(self.path, f"base-{generation}.{part}.npy")
+
+    def _save_base(self, generation, matrix):
+        index_dtype = np.int32 if matrix.nnz < 2 ** 31 - 1 else np.int64
+        np.save(self._base_file(generation, 'data'), matrix.data.astype(np.float32))
+        np.save(self._base_file(generation, 'squared'), np.square(matrix.data.astype(np.float32)))
+        np.save(self._base_file(generation, 'indices'), matrix.indices.astype(index_dtype))
+        np.save(self._base_file(generation, 'indptr'), matrix.indptr.astype(index_dtype))
+        # Document frequencies of the whole segment, so queries don't recount them
+        np.save(self._base_file(generation, 'df'),
+                np.bincount(matrix.indices, minlength=self.n_features).astype(np.int64))
+
+    def _delete_base_files(self, generation):
+        if generation <= 0:
+            return
+        for part in ('data', 'squared', 'indices', 'indptr', 'df'):
+            try:
+                os.remove(self._base_file(generation, part))
+            except OSError:
+                pass
+
+    def _load_base(self):
+        """Memory-map the current base segment"""
+        if self._generation == 0:
+            return None
+        if self._base is None:
+            data = np.load(self._base_file(self._generation, 'data'), mmap_mode='r')
+            squared = np.load(self._base_file(self._generation, 'squared'), mmap_mode='r')
+            indices = np.load(self._base_file(self._generation, 'indices'), mmap_mode='r')
+            indptr = np.load(self._base_file(self._generation, 'indptr'), mmap_mode='r')
+            shape = (len(indptr) - 1, self.n_features)
+            self._base = {
+                'matrix': sp.csr_matrix((data, indices, indptr), shape=shape, copy=False),
+                'squared': sp.csr_matrix((squared, indices, indptr), shape=shape, copy=False),
+                'df': np.load(self._base_file(self._generation, 'df'), mmap_mode='r'),
+            }
+        return self._base
+
+    def _load_delta(self):
+        """Candidates added since the last compaction, as a CSR matrix"""
+        ids, data, indices, indptr = [], [], [], [0]
+        for candidate_id, term_ids, term_counts in self._db.execute(
+                "SELECT id, term_ids, term_counts FROM candidates WHERE segment = 0 ORDER BY rowid"):
+            ids.append(candidate_id)
+            indices.append(np.frombuffer(term_ids, dtype=np.int32))
+            data.append(np.frombuffer(term_counts, dtype=np.float32))
+            indptr.append(indptr[-1] + len(indices[-1]))
+        if not ids:
+            return [], sp.csr_matrix((0, self.n_features), dtype=np.float32)
+        matrix = sp.csr_matrix((np.concatenate(data), np.concatenate(indices), np.array(indptr)),
+                               shape=(len(ids), self.n_features))
+        return ids, matrix
+
+    def _get_view(self):
+        """Segments, candidate ids and document frequencies for ranking (cached until a write)"""
+        # data_version changes when another connection commits; our own
+        # writes drop the view directly
+        data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._view = None
+        if self._view is not None:
+            return self._view
+
+        # One read transaction, so the generation and the rows come from the same snapshot
+        self._db.execute("BEGIN")
+        try:
+            self._sync_generation()
+            self._view = self._build_view()
+        finally:
+            self._db.commit()
+        return self._view
+
+    def _build_view(self):
+        base = self._load_base()
+        segments, ids, live = [], [], []
+        df = np.zeros(self.n_features, dtype=np.int64)
+
+        if base is not None:
+            rows = self._db.execute(
+                "SELECT id, row, deleted FROM candidates WHERE segment = ? ORDER BY row", (self._generation,)
+            ).fetchall()
+            segments.append((base['matrix'], base['squared']))
+            df += base['df']
+            for candidate_id, row, deleted in rows:
+                if deleted:
+                    # Deleted rows still sit in the base arrays; take them out of the counts
+                    start, stop = base['matrix'].indptr[row], base['matrix'].indptr[row + 1]
+                    np.subtract.at(df, base['matrix'].indices[start:stop], 1)
+                else:
+                    ids.append(candidate_id)
+                    live.append(row)
+
+        delta_ids, delta = self._load_delta()
+        if delta.shape[0]:
+            offset = base['matrix'].shape[0] if base is not None else 0
+            segments.append((delta, delta.multiply(delta).tocsr()))
+            df += np.bincount(delta.indices, minlength=self.n_features)
+            ids.extend(delta_ids)
+            live.extend(range(offset, offset + len(delta_ids)))
+
+        return {
+            'segments': segments,
+            'ids': ids,
+            'live': np.array(live, dtype=np.int64),
+            'count': len(ids),
+            'df': df,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
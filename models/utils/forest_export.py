@@ -0,0 +1,208 @@
+"""
+Flattened inference format for a fitted RandomForestClassifier
+
+export_forest writes every tree's nodes into shared, contiguous NumPy
+arrays (children, split feature, threshold and leaf class probabilities)
+plus a small versioned meta.json, one .npy file per array. FlatForest
+loads them memory-mapped, so forked workers share one physical copy of
+the model, and predicts a whole batch by walking all trees at once with
+array operations. Predictions are identical to the forest's predict.
+
+An artifact directory holds one subdirectory per export and a CURRENT
+file naming the live one. Exports never touch files that are already
+published, so workers that mapped an earlier export keep reading it
+intact until they reload.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+import sklearn
+
+FORMAT_VERSION = 1
+
+# File in the artifact directory naming the live export subdirectory
+POINTER = "CURRENT"
+
+ARRAYS = ("left", "right", "feature", "threshold", "missing_left", "value", "roots", "classes")
+
+# Before scikit-learn 1.4 tree_.value held class counts, normalised at predict time
+_VALUE_IS_COUNTS = tuple(int(part) for part in sklearn.__version__.split(".")[:2]) < (1, 4)
+
+
+def export_forest(model, path):
+    """
+    Write a fitted single-output RandomForestClassifier to a flat artifact directory
+
+    The arrays go into a new subdirectory, which is published by atomically
+    replacing the CURRENT pointer. The previous export is kept for readers
+    that resolved the pointer just before the swap; older ones are removed
+    (already-mapped files stay readable until they are unmapped).
+
+    Args:
+        model: Fitted sklearn forest classifier
+        path (str): Artifact directory (created if needed)
+    """
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be exported")
+
+    n_classes = int(model.n_classes_)
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    left, right, feature, threshold, missing_left, value = [], [], [], [], [], []
+    for tree, offset in zip(trees, offsets[:-1]):
+        is_leaf = tree.children_left == -1
+        # Child ids become global node ids; leaves keep -1
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(tree.feature)
+        threshold.append(tree.threshold)
+        nodes = tree.__getstate__()["nodes"]
+        missing_left.append(nodes["missing_go_to_left"].astype(bool) if "missing_go_to_left" in nodes.dtype.names
+                            else np.zeros(tree.node_count, dtype=bool))
+
+        # Per-node class probabilities, exactly as the tree's predict_proba returns them
+        proba = np.array(tree.value[:, 0, :n_classes], dtype=np.float64)
+        if _VALUE_IS_COUNTS:
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+        value.append(proba)
+
+    arrays = {
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "missing_left": np.concatenate(missing_left),
+        "value": np.ascontiguousarray(np.concatenate(value)),
+        "roots": offsets[:-1].astype(np.int64),
+        "classes": np.asarray(model.classes_),
+    }
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_features": int(model.n_features_in_),
+        "n_classes": n_classes,
+        "n_trees": len(trees),
+        "n_nodes": int(offsets[-1]),
+        "max_depth": int(max(tree.max_depth for tree in trees)),
+        "sklearn_version": sklearn.__version__,
+    }
+
+    os.makedirs(path, exist_ok=True)
+    version = f"v{time.time_ns()}-{os.getpid()}"
+    tmp_dir = os.path.join(path, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    os.rename(tmp_dir, os.path.join(path, version))
+
+    previous = _current_version(path)
+    tmp_pointer = os.path.join(path, f"{POINTER}.{os.getpid()}.tmp")
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+    os.replace(tmp_pointer, os.path.join(path, POINTER))
+
+    for entry in os.listdir(path):
+        if entry.startswith("v") and entry not in (version, previous):
+            shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+    logging.info(f"Exported forest with {meta['n_trees']} trees and {meta['n_nodes']} nodes to "
+                 f"{os.path.join(path, version)}")
+
+
+def _current_version(path):
+    """Name of the live export subdirectory, or None"""
+    try:
+        with open(os.path.join(path, POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def forest_exists(path):
+    """True if path holds a published forest artifact"""
+    return _current_version(path) is not None
+
+
+class FlatForest:
+    """Batch predictor over a flattened forest artifact (see export_forest)"""
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.n_features_in_ = meta["n_features"]
+        self.classes_ = arrays["classes"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.missing_left = arrays["missing_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load the live export of an artifact directory; with mmap the node
+        arrays are memory-mapped read-only
+
+        Raises:
+            ValueError: If the artifact is missing or has another format version
+        """
+        version = _current_version(path)
+        if version is None:
+            raise ValueError(f"No forest artifact at {path}")
+        path = os.path.join(path, version)
+        meta_path = os.path.join(path, "meta.json")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest format version {meta.get('format_version')} "
+                             f"(expected {FORMAT_VERSION})")
+
+        mmap_mode = "r" if mmap else None
+        arrays = {}
+        for name in ARRAYS:
+            # Class labels may be objects (e.g. strings), which can't be memory-mapped
+            allow_pickle = name == "classes"
+            arrays[name] = np.load(os.path.join(path, f"{name}.npy"),
+                                   mmap_mode=None if allow_pickle else mmap_mode, allow_pickle=allow_pickle)
+        return cls(meta, arrays)
+
+    def _leaves(self, X):
+        """Leaf node id of every sample in every tree, shape (n_samples, n_trees)"""
+        # Trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a 2D array with {self.n_features_in_} features, got shape {X.shape}")
+
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.meta["max_depth"]):
+            left = self.left[nodes]
+            internal = left != -1
+            if not internal.any():
+                break
+            values = X[rows, np.where(internal, self.feature[nodes], 0)]
+            go_left = np.where(np.isnan(values), self.missing_left[nodes], values <= self.threshold[nodes])
+            nodes = np.where(internal, np.where(go_left, left, self.right[nodes]), nodes)
+        return nodes
+
+    def predict_proba(self, X):
+        """Mean class probabilities over the trees, like RandomForestClassifier.predict_proba"""
+        leaves = self._leaves(X)
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+        # Accumulate tree by tree, in the forest's order
+        for tree in range(leaves.shape[1]):
+            proba += self.value[leaves[:, tree]]
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X):
+        """Predicted class labels, like RandomForestClassifier.predict"""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
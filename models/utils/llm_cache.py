@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM extraction results
+
+    Entries are content-addressed: the key is a hash of the model name, the
+    prompt and the text, so the same resume/prompt pair is only sent to the
+    model once. Lookups go to an in-memory LRU first and then to an optional
+    SQLite file shared by every worker on the host. The memory tier is
+    bounded by entry count only; the disk tier by entry count and by the
+    bytes of its stored values (``max_disk_bytes``), evicting the oldest
+    entries first. Entries older than ``max_age_seconds`` are treated as
+    misses and pruned.
+
+    Values are stored on disk as JSON; ``compact``, if given, converts a
+    value into the form kept in the memory tier and returned by get/set
+    (e.g. ResumeRecord.from_dict).
+    """
+
+    def __init__(self, path=None, max_memory_items=1024, max_disk_items=100000,
+                 max_age_seconds=30 * 24 * 3600, prune_every=100, compact=None, max_disk_bytes=None):
+        self.path = path
+        self.compact = compact
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_seconds = max_age_seconds
+        self.prune_every = prune_every
+
+        self._memory = OrderedDict()  # key -> (created_at, value)
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+        # Opened lazily, once per process: a SQLite handle must never be
+        # used across fork (e.g. from a preloading gunicorn master)
+        self._db = None
+        self._db_pid = None
+
+    def _connection(self):
+        """This process's SQLite connection, or None without a disk tier"""
+        if not self.path:
+            return None
+        if self._db_pid != os.getpid():
+            self._db_pid = os.getpid()
+            self._db = None
+            try:
+                db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS llm_cache_created_at ON llm_cache (created_at)")
+                db.commit()
+                self._db = db
+            except sqlite3.Error as e:
+                logging.warning(f"LLM disk cache unavailable at {self.path}: {str(e)}")
+        return self._db
+
+    @staticmethod
+    def make_key(model_name, prompt, text):
+        """Content address for a (model, prompt, text) triple"""
+        payload = json.dumps([model_name, prompt, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and not self._expired(entry[0], now):
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return entry[1]
+            if entry:
+                del self._memory[key]
+
+            if self._connection() is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logging.warning(f"LLM disk cache read failed: {str(e)}")
+                    row = None
+                if row and not self._expired(row[1], now):
+                    value = self._remember(key, row[1], json.loads(row[0]))
+                    self._counters["disk_hits"] += 1
+                    return value
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        """Store a JSON-serialisable value under key in both tiers; returns the value as get would"""
+        now = time.time()
+        with self._lock:
+            stored = self._remember(key, now, value)
+            self._counters["writes"] += 1
+
+            if self._connection() is None:
+                return stored
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now)
+                )
+                self._db.commit()
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= self.prune_every:
+                    self._prune_disk(now)
+            except sqlite3.Error as e:
+                logging.warning(f"LLM disk cache write failed: {str(e)}")
+            return stored
+
+    def stats(self):
+        """Hit/miss counters and the overall hit rate"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._connection() is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def _expired(self, created_at, now):
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+
+    def _remember(self, key, created_at, value):
+        """Insert into the memory tier, evicting least recently used entries; returns the stored value"""
+        if self.compact is not None:
+            value = self.compact(value)
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+        return value
+
+    def _prune_disk(self, now):
+        """Evict expired entries, then the oldest ones beyond max_disk_items and max_disk_bytes"""
+        self._writes_since_prune = 0
+        if self.max_age_seconds is not None:
+            self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.max_age_seconds,))
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_items,)
+        )
+        if self.max_disk_bytes is not None:
+            # Keep the newest entries whose values add up to max_disk_bytes
+            self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(LENGTH(CAST(value AS BLOB))) "
+                "OVER (ORDER BY created_at DESC, rowid DESC) AS total FROM llm_cache) WHERE total > ?)",
+                (self.max_disk_bytes,)
+            )
+        self._db.commit()
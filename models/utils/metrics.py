@@ -0,0 +1,357 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, fine enough for p50/p99 via histogram_quantile()
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Directory shared by the worker processes of one server, like
+# prometheus_client's PROMETHEUS_MULTIPROC_DIR. When set, each process saves
+# its metrics to a file there and /metrics adds up every file, so a scrape
+# reports the whole server instead of whichever worker answered it
+METRICS_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+# Minimum seconds between two saves of a worker's metrics outside a scrape
+METRICS_SAVE_INTERVAL = float(os.getenv("METRICS_SAVE_INTERVAL", "1.0"))
+# Totals of exited workers, folded together by collect_exited_process
+EXITED_FILE = "exited.json"
+# Key in EXITED_FILE listing the process files already folded into it
+_MERGED_KEY = "__merged__"
+
+# Metrics created without an explicit registry; this is what /metrics renders
+_registry = []
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = [(name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+               for name, value in pairs]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels, rendered in Prometheus text format"""
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (_registry if registry is None else registry).append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def snapshot(self):
+        """Copy of the values, keyed by label values"""
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def render(self, values=None):
+        """Exposition lines for values (default: this process's own)"""
+        values = self.snapshot() if values is None else values
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels, rendered in Prometheus text format
+
+    Besides the usual _bucket/_sum/_count series, the quantiles listed in
+    ``quantiles`` are estimated from the buckets (the same linear
+    interpolation as PromQL's histogram_quantile) and exported as a
+    ``<name>_quantile`` gauge, so p50/p99 can be read straight off /metrics.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, quantiles=(0.5, 0.99),
+                 registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.quantiles = tuple(quantiles)
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        (_registry if registry is None else registry).append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock time spent in the with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantile(self, q, **labels):
+        """Estimate the q-quantile from the buckets; None before any observation"""
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            state = list(state) if state is not None else None
+        return self._estimate(q, state)
+
+    def _estimate(self, q, state):
+        if not state or not state[-1]:
+            return None
+        rank = q * state[-1]
+        lower_bound, lower_count = 0.0, 0
+        for bound, count in zip(self.buckets, state):
+            if count >= rank:
+                if count == lower_count:
+                    return bound
+                return lower_bound + (bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+            lower_bound, lower_count = bound, count
+        # Above the largest finite bucket, like histogram_quantile
+        return self.buckets[-1]
+
+    def snapshot(self):
+        """Copy of the bucket counts, sum and count, keyed by label values"""
+        with self._lock:
+            return {key: list(state) for key, state in self._values.items()}
+
+    @staticmethod
+    def merge(total, state):
+        return list(state) if total is None else [a + b for a, b in zip(total, state)]
+
+    def render(self, values=None):
+        """Exposition lines for values (default: this process's own)"""
+        values = sorted((self.snapshot() if values is None else values).items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, state in values:
+            for bound, count in zip(self.buckets, state):
+                labels = _format_labels(self.labelnames, key, [("le", repr(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+
+        if self.quantiles:
+            lines.append(f"# HELP {self.name}_quantile {self.documentation} (estimated from buckets)")
+            lines.append(f"# TYPE {self.name}_quantile gauge")
+            for key, state in values:
+                for q in self.quantiles:
+                    labels = _format_labels(self.labelnames, key, [("quantile", str(q))])
+                    lines.append(f"{self.name}_quantile{labels} {self._estimate(q, state)}")
+        return lines
+
+
+_process_file = None  # (pid, path) of this process's metrics file
+_last_save = 0.0
+_pending_save = None  # (pid, threading.Timer) of a scheduled save
+_save_lock = threading.Lock()
+
+
+def _metrics_file(directory):
+    global _process_file
+    # Named per process start, not just pid: a recycled pid must not
+    # overwrite (and so shrink) an exited worker's totals
+    pid = os.getpid()
+    if _process_file is None or _process_file[0] != pid or os.path.dirname(_process_file[1]) != directory:
+        _process_file = (pid, os.path.join(directory, f"{pid}-{time.time_ns()}.json"))
+    return _process_file[1]
+
+
+def _write_state(path, state):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _read_state(path):
+    """Saved metrics in path, or None if it is gone or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Folded into EXITED_FILE since the directory was listed
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Skipping unreadable metrics file {path}: {str(e)}")
+        return None
+
+
+def _add_state(totals, metrics, state):
+    """Add saved metric values to totals (metric name -> label values -> value)"""
+    for name, entries in state.items():
+        metric = metrics.get(name)
+        if metric is None:
+            continue
+        values = totals.setdefault(name, {})
+        for key, value in entries:
+            key = tuple(key)
+            values[key] = metric.merge(values.get(key), value)
+
+
+def save_process_metrics(directory=None, registry=None):
+    """Write this process's metrics to its file in the shared metrics directory"""
+    global _last_save
+    directory = METRICS_DIR if directory is None else directory
+    if not directory:
+        return
+    state = {metric.name: [[list(key), value] for key, value in metric.snapshot().items()]
+             for metric in (_registry if registry is None else registry)}
+    with _save_lock:
+        _write_state(_metrics_file(directory), state)
+        _last_save = time.monotonic()
+
+
+def maybe_save_process_metrics():
+    """
+    save_process_metrics at most every METRICS_SAVE_INTERVAL seconds
+
+    Updates inside the interval are saved by a trailing timer, so a worker
+    that goes idle still publishes its last requests.
+    """
+    global _pending_save
+    if not METRICS_DIR:
+        return
+    wait = METRICS_SAVE_INTERVAL - (time.monotonic() - _last_save)
+    if wait <= 0:
+        save_process_metrics()
+        return
+    with _save_lock:
+        if _pending_save is not None and _pending_save[0] == os.getpid():
+            return
+        timer = threading.Timer(wait, _save_pending)
+        timer.daemon = True
+        _pending_save = (os.getpid(), timer)
+    timer.start()
+
+
+def _save_pending():
+    global _pending_save
+    with _save_lock:
+        _pending_save = None
+    try:
+        save_process_metrics()
+    except OSError as e:
+        logging.warning(f"Couldn't save process metrics: {str(e)}")
+
+
+def clear_process_metrics(directory=None):
+    """Remove every process's metrics file, e.g. when the server starts"""
+    directory = METRICS_DIR if directory is None else directory
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+
+
+def collect_exited_process(pid, directory=None, registry=None):
+    """
+    Fold an exited process's metrics files into EXITED_FILE
+
+    Called by the gunicorn master for every worker that exits, so workers
+    recycled by max_requests don't leave a file each behind. EXITED_FILE
+    lists the files it already includes; readers skip those, and the files
+    are removed only after EXITED_FILE is replaced, so no scrape counts a
+    process twice.
+    """
+    directory = METRICS_DIR if directory is None else directory
+    if not directory:
+        return
+    paths = glob.glob(os.path.join(directory, f"{pid}-*.json"))
+    if not paths:
+        return
+    registry = _registry if registry is None else registry
+    metrics = {metric.name: metric for metric in registry}
+
+    exited_path = os.path.join(directory, EXITED_FILE)
+    exited = _read_state(exited_path) or {}
+    merged_files = [name for name in exited.pop(_MERGED_KEY, [])
+                    if os.path.exists(os.path.join(directory, name))]
+    totals = {name: {tuple(key): value for key, value in entries} for name, entries in exited.items()}
+    for path in paths:
+        state = _read_state(path)
+        if state is not None:
+            _add_state(totals, metrics, state)
+        merged_files.append(os.path.basename(path))
+
+    state = {name: [[list(key), value] for key, value in values.items()] for name, values in totals.items()}
+    state[_MERGED_KEY] = merged_files
+    _write_state(exited_path, state)
+    for path in paths:
+        os.remove(path)
+
+
+def _merged_values(directory, registry):
+    """Per-metric values added up over every process file in directory"""
+    save_process_metrics(directory, registry)
+    merged = {metric.name: {} for metric in registry}
+    metrics = {metric.name: metric for metric in registry}
+    # List the directory before reading EXITED_FILE: a file folded in
+    # meanwhile is then either skipped or already gone
+    paths = glob.glob(os.path.join(directory, "*.json"))
+    exited = _read_state(os.path.join(directory, EXITED_FILE)) or {}
+    skip = set(exited.pop(_MERGED_KEY, [])) | {EXITED_FILE}
+    _add_state(merged, metrics, exited)
+    for path in paths:
+        if os.path.basename(path) in skip:
+            continue
+        state = _read_state(path)
+        if state is not None:
+            _add_state(merged, metrics, state)
+    return merged
+
+
+def render_prometheus(directory=None, registry=None):
+    """
+    All registered metrics in the Prometheus text exposition format
+
+    With a metrics directory (METRICS_MULTIPROC_DIR) the values are the
+    sums over every process that saved there, including exited workers,
+    so counters never go backwards when a worker is recycled.
+    """
+    directory = METRICS_DIR if directory is None else directory
+    registry = _registry if registry is None else registry
+    merged = _merged_values(directory, registry) if directory else None
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render(merged[metric.name] if merged is not None else None))
+    return "\n".join(lines) + "\n"
+
+
+# Metrics shared by the model server, llm_score and the scorer
+STAGE_SECONDS = Histogram("neohire_stage_seconds", "Time spent in each scoring stage", ["stage"])
+LLM_CALLS = Counter("neohire_llm_calls_total", "LLM requests sent to the provider", ["prompt"])
+LLM_FALLBACKS = Counter("neohire_llm_fallbacks_total",
+                        "LLM extractions that fell back to the regex path", ["prompt"])
+CACHE_HITS = Counter("neohire_cache_hits_total", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("neohire_cache_misses_total", "Cache misses", ["cache"])
+ERRORS = Counter("neohire_errors_total", "Errors by stage", ["stage"])
@@ -1,70 +1,196 @@
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from sklearn.model_selection import train_test_split
+import hashlib
 import joblib
 import logging
-import spacy
 import os
+import time
+from utils.forest_export import FlatForest, export_forest, forest_exists
+from utils.nlp_models import get_nlp, is_model_available
+
+# Bump whenever _features_from_doc changes, so cached feature matrices are rebuilt
+FEATURE_VERSION = 1
+
+# Trained models live next to the code (models/models/), whatever the working
+# directory; SKILLS_MODEL_DIR overrides the location
+MODEL_DIR = os.getenv("SKILLS_MODEL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models'))
 
 class MLResumeParser:
     def __init__(self):
         self.skills_classifier = None
-        self.model_path = os.path.join('models', 'skills_classifier.joblib')
+        self.model_path = os.path.join(MODEL_DIR, 'skills_classifier.joblib')
+        # Flattened, memory-mappable copy of the forest used for inference
+        self.forest_path = os.path.join(MODEL_DIR, 'skills_classifier.forest')
         
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-            self.has_spacy = True
-        except:
-            self.has_spacy = False
+        # The spaCy model itself is loaded lazily and shared (see nlp below)
+        self.has_spacy = is_model_available()
+        if not self.has_spacy:
             logging.warning("spaCy model not available for ML parser")
     
-    def train_skills_classifier(self, training_data):
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline, loaded on first use"""
+        return get_nlp()
+    
+    def train_skills_classifier(self, training_data, test_size=0.2, n_jobs=-1, cache_dir=None,
+                                batch_size=256, n_process=1):
         """
         Train a classifier to identify skills in text
         
+        Features are extracted in one nlp.pipe pass and cached on disk under
+        cache_dir, keyed by the texts, the feature version and the spaCy
+        model, so retraining on the same data skips spaCy entirely. A
+        stratified held-out split is used for evaluation and the forest is
+        trained on all cores.
+        
         Args:
             training_data: List of (text, is_skill) pairs
+            test_size (float): Fraction held out for evaluation (0 to train on everything)
+            n_jobs (int): Cores used to train the forest (-1 for all)
+            cache_dir (str): Feature cache directory (default SKILLS_FEATURE_CACHE
+                or feature_cache/ in MODEL_DIR; an empty string disables the cache)
+            batch_size (int): Texts per nlp.pipe batch
+            n_process (int): spaCy worker processes for feature extraction
+        
+        Returns:
+            dict: Held-out metrics, feature importances and seconds per stage
         """
         logging.info(f"Training skills classifier with {len(training_data)} examples")
+        timings = {}
         
         # Extract features and labels
-        X = []
-        y = []
-        
-        for text, is_skill in training_data:
-            X.append(self._extract_features(text))
-            y.append(1 if is_skill else 0)
+        started = time.perf_counter()
+        texts = [text for text, _ in training_data]
+        y = np.array([1 if is_skill else 0 for _, is_skill in training_data])
+        X, cache_hit = self._cached_features(texts, cache_dir, batch_size, n_process)
+        timings['features'] = time.perf_counter() - started
         
-        # Convert to numpy arrays
-        X = np.array(X)
-        y = np.array(y)
+        # Hold out a stratified split for evaluation when both classes allow it
+        started = time.perf_counter()
+        X_train, X_test, y_train, y_test = X, X, y, y
+        if test_size:
+            try:
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=test_size, random_state=42, stratify=y
+                )
+            except ValueError as e:
+                # Too few examples of a class to stratify; evaluate on the training set
+                logging.warning(f"No held-out split, evaluating on the training data: {str(e)}")
+        timings['split'] = time.perf_counter() - started
         
         # Train model
+        started = time.perf_counter()
         model = RandomForestClassifier(
             n_estimators=100, 
             max_depth=10,
-            random_state=42
+            random_state=42,
+            n_jobs=n_jobs
+        )
+        model.fit(X_train, y_train)
+        timings['training'] = time.perf_counter() - started
+        
+        # Evaluate on the held-out split
+        started = time.perf_counter()
+        predictions = model.predict(X_test)
+        precision, recall, f1, _ = precision_recall_fscore_support(
+            y_test, predictions, average='binary', zero_division=0
         )
-        model.fit(X, y)
+        metrics = {
+            'accuracy': accuracy_score(y_test, predictions),
+            'train_accuracy': model.score(X_train, y_train),
+            'precision': precision,
+            'recall': recall,
+            'f1': f1,
+            'n_train': len(y_train),
+            'n_test': len(y_test) if X_test is not X else 0,
+            'feature_cache_hit': cache_hit,
+        }
+        timings['evaluation'] = time.perf_counter() - started
         
         # Save model
+        started = time.perf_counter()
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         joblib.dump(model, self.model_path)
+        timings['save'] = time.perf_counter() - started
+        
+        # Export the flattened inference artifact
+        started = time.perf_counter()
+        export_forest(model, self.forest_path)
+        timings['export'] = time.perf_counter() - started
         
         # Set model
         self.skills_classifier = model
         
+        for stage, seconds in timings.items():
+            logging.info(f"Skills classifier {stage}: {seconds:.3f}s")
+        
         # Return model metrics
-        return {
-            'accuracy': model.score(X, y),
-            'feature_importance': dict(zip(self._get_feature_names(), model.feature_importances_))
-        }
+        metrics['feature_importance'] = dict(zip(self._get_feature_names(), model.feature_importances_))
+        metrics['timings'] = {stage: round(seconds, 4) for stage, seconds in timings.items()}
+        return metrics
+    
+    def _cached_features(self, texts, cache_dir=None, batch_size=256, n_process=1):
+        """
+        Feature matrix for texts, read from or written to the on-disk cache
+        
+        Returns:
+            tuple: (feature matrix, whether it came from the cache)
+        """
+        if cache_dir is None:
+            cache_dir = os.getenv("SKILLS_FEATURE_CACHE", os.path.join(MODEL_DIR, 'feature_cache'))
+        if not cache_dir:
+            return self._extract_features_batch(texts, batch_size, n_process), False
+        
+        # The key covers everything the features depend on
+        nlp = self.nlp if self.has_spacy else None
+        model_id = f"{nlp.meta.get('name')}-{nlp.meta.get('version')}" if nlp is not None else "none"
+        digest = hashlib.sha256()
+        digest.update(f"{FEATURE_VERSION}|{model_id}|{len(texts)}".encode('utf-8'))
+        for text in texts:
+            digest.update(b"\0" + text.encode('utf-8'))
+        cache_path = os.path.join(cache_dir, f"features-{digest.hexdigest()[:32]}.npy")
+        
+        if os.path.exists(cache_path):
+            try:
+                return np.load(cache_path), True
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable feature cache {cache_path}: {str(e)}")
+        
+        features, used_spacy = self._extract_features_with_source(texts, batch_size, n_process)
+        if used_spacy != (nlp is not None):
+            # spaCy failed mid-run; these fallback features don't belong under this key
+            logging.warning("Not caching features extracted without spaCy")
+            return features, False
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write then rename so an interrupted run never leaves a partial file
+        tmp_path = cache_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, features)
+        os.replace(tmp_path, cache_path)
+        return features, False
     
     def load_skills_classifier(self):
-        """Load trained skills classifier if it exists"""
+        """
+        Load trained skills classifier if it exists
+        
+        The memory-mapped flattened forest is preferred, so processes forked
+        from one parent share a single copy of the model; the pickled sklearn
+        model is the fallback.
+        """
+        if forest_exists(self.forest_path):
+            try:
+                self.skills_classifier = FlatForest.load(self.forest_path)
+                logging.info("Loaded flattened skills classifier")
+                return True
+            except Exception as e:
+                logging.warning(f"Can't load flattened skills classifier, trying {self.model_path}: {str(e)}")
+        
         try:
             if os.path.exists(self.model_path):
                 self.skills_classifier = joblib.load(self.model_path)
-                logging.info("Loaded skills classifier model")
+                logging.info("Loaded skills classifier model (run export_skills_classifier for faster loading)")
                 return True
             else:
                 logging.warning(f"Skills classifier model not found at {self.model_path}")
@@ -73,22 +199,82 @@ class MLResumeParser:
             logging.error(f"Error loading skills classifier: {str(e)}")
             return False
     
+    def export_skills_classifier(self):
+        """Write the flattened inference artifact for the loaded sklearn classifier"""
+        if not isinstance(self.skills_classifier, RandomForestClassifier):
+            raise ValueError("No sklearn skills classifier loaded to export")
+        export_forest(self.skills_classifier, self.forest_path)
+    
     def is_skill(self, text):
         """Predict if a text is a skill"""
+        return self.is_skill_batch([text])[0]
+    
+    def is_skill_batch(self, texts):
+        """
+        Predict which of many texts are skills with a single classifier call
+        
+        Args:
+            texts (list): Candidate skill strings
+        
+        Returns:
+            list: One bool per text, in the same order
+        """
+        if not texts:
+            return []
+        
         if not self.skills_classifier:
             logging.warning("Skills classifier not loaded")
-            return True  # Default to True to avoid missing skills
-            
-        features = self._extract_features(text)
-        prediction = self.skills_classifier.predict([features])[0]
+            return [True] * len(texts)  # Default to True to avoid missing skills
         
-        return bool(prediction)
+        features = self._extract_features_batch(texts)
+        predictions = self.skills_classifier.predict(features)
+        
+        return [bool(prediction) for prediction in predictions]
     
     def _extract_features(self, text):
         """Extract features from text for classification"""
+        return self._extract_features_batch([text])[0]
+    
+    def _extract_features_batch(self, texts, batch_size=256, n_process=1):
+        """
+        Extract the feature matrix for many texts, running spaCy once via nlp.pipe
+        
+        Docs are turned into feature rows as they stream out of the pipe, so
+        only one batch of Docs is held in memory at a time.
+        
+        Args:
+            texts (list): Texts to featurise
+            batch_size (int): Texts per nlp.pipe batch
+            n_process (int): spaCy worker processes
+        
+        Returns:
+            numpy.ndarray: One row of features per text
+        """
+        return self._extract_features_with_source(texts, batch_size, n_process)[0]
+    
+    def _extract_features_with_source(self, texts, batch_size=256, n_process=1):
+        """
+        Like _extract_features_batch, also reporting whether spaCy produced the features
+        
+        Returns:
+            tuple: (feature matrix, False if the spaCy-free fallback was used)
+        """
         # Clean text
-        text = text.strip()
+        texts = [text.strip() for text in texts]
         
+        if self.has_spacy:
+            try:
+                # Only POS tags and entities are used, so skip parsing and lemmas
+                disabled = [name for name in ("parser", "lemmatizer") if name in self.nlp.pipe_names]
+                docs = self.nlp.pipe(texts, disable=disabled, batch_size=batch_size, n_process=n_process)
+                return np.array([self._features_from_doc(text, doc) for text, doc in zip(texts, docs)]), True
+            except Exception as e:
+                logging.warning(f"spaCy feature extraction failed: {str(e)}")
+        
+        return np.array([self._features_from_doc(text, None) for text in texts]), False
+    
+    def _features_from_doc(self, text, doc):
+        """Build the feature vector for one cleaned text and its spaCy Doc (or None)"""
         # Initialize features
         features = {
             'length': len(text),
@@ -102,6 +288,10 @@ class MLResumeParser:
             'contains_period': '.' in text,
             'starts_with_verb': False,
             'has_technical_term': False,
+            # Default values if spaCy processing is unavailable or fails
+            'is_entity': 0,
+            'is_org_entity': 0,
+            'is_product_entity': 0,
         }
         
         # Check for technical terminology
@@ -110,29 +300,16 @@ class MLResumeParser:
         features['has_technical_term'] = any(term in text.lower() for term in tech_terms)
         
         # Use spaCy for linguistic features if available
-        if self.has_spacy:
-            try:
-                doc = self.nlp(text)
-                
-                # Check if starts with verb
-                if len(doc) > 0:
-                    features['starts_with_verb'] = doc[0].pos_ == "VERB"
-                
-                # Add entity type if detected
-                if len(doc.ents) > 0:
-                    features['is_entity'] = 1
-                    features['is_org_entity'] = 1 if doc.ents[0].label_ == "ORG" else 0
-                    features['is_product_entity'] = 1 if doc.ents[0].label_ == "PRODUCT" else 0
-                else:
-                    features['is_entity'] = 0
-                    features['is_org_entity'] = 0
-                    features['is_product_entity'] = 0
-            except:
-                # Default values if spaCy processing fails
-                features['starts_with_verb'] = False
-                features['is_entity'] = 0
-                features['is_org_entity'] = 0
-                features['is_product_entity'] = 0
+        if doc is not None:
+            # Check if starts with verb
+            if len(doc) > 0:
+                features['starts_with_verb'] = doc[0].pos_ == "VERB"
+            
+            # Add entity type if detected
+            if len(doc.ents) > 0:
+                features['is_entity'] = 1
+                features['is_org_entity'] = 1 if doc.ents[0].label_ == "ORG" else 0
+                features['is_product_entity'] = 1 if doc.ents[0].label_ == "PRODUCT" else 0
         
         # Convert to flat list in consistent order
         return [features[f] for f in self._get_feature_names()]
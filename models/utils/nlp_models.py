@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+import time
+
+try:
+    import spacy
+    HAS_SPACY_LIB = True
+except ImportError:
+    HAS_SPACY_LIB = False
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+# Loaded pipelines, keyed by (model name, excluded components)
+_models = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def is_model_available(name=DEFAULT_MODEL):
+    """Check whether a spaCy model is installed, without loading it"""
+    if not HAS_SPACY_LIB:
+        return False
+    return spacy.util.is_package(name) or os.path.isdir(name)
+
+
+def get_nlp(name=DEFAULT_MODEL, exclude=()):
+    """
+    Get a spaCy pipeline, loading it on first use
+
+    Every module in the process shares the same instance, so the model is
+    loaded once per worker instead of once per importing module. Prefer the
+    full pipeline with ``nlp.pipe(..., disable=[...])`` when only some
+    components are needed per call; ask for a reduced pipeline here (e.g.
+    NER only) only when the excluded components are never used in the
+    process, since each distinct ``exclude`` set is a separate copy.
+
+    Args:
+        name (str): spaCy model name or path
+        exclude (iterable): Pipeline components not to load at all
+
+    Returns:
+        Language: The loaded pipeline, or None if it can't be loaded
+    """
+    key = (name, tuple(sorted(exclude)))
+    if key in _models:
+        return _models[key]
+
+    with _lock:
+        # Another thread may have loaded it while we waited
+        if key in _models:
+            return _models[key]
+
+        nlp = None
+        if HAS_SPACY_LIB:
+            rss_before = _current_rss()
+            start = time.perf_counter()
+            try:
+                nlp = spacy.load(name, exclude=list(key[1]))
+                _stats[key] = {
+                    "model": name,
+                    "exclude": list(key[1]),
+                    "pipeline": list(nlp.pipe_names),
+                    "load_seconds": round(time.perf_counter() - start, 3),
+                    "rss_delta_mb": round((_current_rss() - rss_before) / (1024 * 1024), 1)
+                }
+                logging.info(f"Loaded spaCy model {name} in {_stats[key]['load_seconds']}s "
+                             f"(+{_stats[key]['rss_delta_mb']} MB RSS)")
+            except Exception as e:
+                logging.warning(f"spaCy model {name} not available: {str(e)}")
+
+        # Failures are cached too so we don't retry the load on every call
+        _models[key] = nlp
+        return nlp
+
+
+def get_ner_nlp(name=DEFAULT_MODEL):
+    """Get a reduced pipeline that only runs named entity recognition"""
+    return get_nlp(name, exclude=("tagger", "parser", "attribute_ruler", "lemmatizer", "senter"))
+
+
+def model_stats():
+    """
+    Report load time and memory for every pipeline loaded in this process
+
+    Returns:
+        list: One dict per loaded pipeline with load_seconds and rss_delta_mb
+    """
+    return [dict(stats) for stats in _stats.values()]
+
+
+def _current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Not Linux: fall back to peak RSS where the resource module exists
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
@@ -1,17 +1,20 @@
 import re
 import json
+import functools
 import logging
-import spacy
 import PyPDF2
 import docx
+import io
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.nlp_models import get_nlp, is_model_available
+from utils.skill_matcher import SkillMatcher
 
-# Try to load spaCy language model for NER
-try:
-    nlp = spacy.load("en_core_web_sm")
-    HAS_SPACY = True
-except:
-    HAS_SPACY = False
+# spaCy language model for NER, loaded on first use and shared with the scorer
+HAS_SPACY = is_model_available()
+if not HAS_SPACY:
     logging.warning("spaCy model not available - falling back to basic text processing")
 
 # Try to load ML resume parser
@@ -24,13 +27,27 @@ except:
     HAS_ML_PARSER = False
     logging.warning("ML parser not available - falling back to rule-based parsing")
 
-def extract_resume_data(file_path, file_extension):
+# PDF extraction limits; 0 means no limit
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", "0"))
+# Split PDFs with at least PDF_PARALLEL_MIN_PAGES pages across PDF_WORKERS processes
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "1"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+
+# Process pool for large PDFs, started on first use and shared by every call
+# in this process: (pid, executor)
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+def extract_resume_data(file_path, file_extension, pdf_options=None):
     """
     Extract data from resume file
     
     Args:
         file_path (str): Path to the resume file
         file_extension (str): File extension (pdf, docx, json)
+        pdf_options (dict): Optional max_pages, max_bytes and workers
+            overrides for extract_text_from_pdf
     
     Returns:
         dict: Dictionary containing extracted data
@@ -39,7 +56,7 @@ def extract_resume_data(file_path, file_extension):
     
     # Extract text based on file type
     if file_extension == 'pdf':
-        text = extract_text_from_pdf(file_path)
+        text = extract_text_from_pdf(file_path, **(pdf_options or {}))
     elif file_extension == 'docx':
         text = extract_text_from_docx(file_path)
     elif file_extension == 'json':
@@ -50,23 +67,128 @@ def extract_resume_data(file_path, file_extension):
     # Extract structured data from text
     return extract_structured_data_from_text(text)
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file"""
-    text = ""
+def extract_text_from_pdf(file_path, max_pages=None, max_bytes=None, workers=None):
+    """
+    Extract text from PDF file
+    
+    Args:
+        file_path (str): Path to the PDF file
+        max_pages (int): Read at most this many pages (default PDF_MAX_PAGES)
+        max_bytes (int): Stop once this much UTF-8 text is extracted
+            (default PDF_MAX_BYTES)
+        workers (int): Processes for large PDFs (default PDF_WORKERS)
+    
+    Returns:
+        str: Page texts, each followed by a newline
+    
+    Structured extraction needs the whole document, so the pages are
+    collected here (bounded by max_bytes) straight from the page stream,
+    without a list of pages next to the joined text. Use iter_pdf_pages to
+    process pages as they are extracted.
+    """
+    text = io.StringIO()
+    has_text = False
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
+        for page_text in iter_pdf_pages(file_path, max_pages, max_bytes, workers):
+            text.write(page_text)
+            has_text = has_text or not page_text.isspace()
                 
-        if not text.strip():
+        if not has_text:
             logging.warning("PDF text extraction returned empty string, possibly a scanned document")
     except Exception as e:
         logging.error(f"Error extracting text from PDF: {str(e)}")
         raise
     
-    return text
+    return text.getvalue()
+
+def iter_pdf_pages(file_path, max_pages=None, max_bytes=None, workers=None):
+    """
+    Yield the text of each PDF page (with a trailing newline), in page order
+    
+    Pages are streamed one at a time so the whole document never has to be
+    held in memory. PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split
+    into page ranges and extracted by the shared PDF process pool when
+    workers > 1.
+    
+    Args:
+        file_path (str): Path to the PDF file
+        max_pages (int): Read at most this many pages; 0/None for no limit
+        max_bytes (int): Truncate the output at this many UTF-8 bytes; 0/None
+            for no limit
+        workers (int): Number of processes for large PDFs
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_bytes = PDF_MAX_BYTES if max_bytes is None else max_bytes
+    workers = PDF_WORKERS if workers is None else workers
+    
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        if max_pages:
+            page_count = min(page_count, max_pages)
+        
+        if workers > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+            pages = _iter_pdf_pages_parallel(file_path, page_count, workers)
+        else:
+            pages = (_page_text(pdf_reader.pages[page_num]) for page_num in range(page_count))
+        
+        remaining = max_bytes
+        for page_num, page_text in enumerate(pages, 1):
+            if max_bytes:
+                encoded = page_text.encode('utf-8')
+                if len(encoded) >= remaining:
+                    # Filling the cap exactly on the last page loses nothing
+                    if len(encoded) > remaining or page_num < page_count:
+                        logging.warning(f"PDF text truncated at {max_bytes} bytes")
+                    yield encoded[:remaining].decode('utf-8', errors='ignore')
+                    return
+                remaining -= len(encoded)
+            yield page_text
+
+def _page_text(page):
+    """Text of one PDF page followed by a newline"""
+    return (page.extract_text() or "") + "\n"
+
+def _get_pdf_pool(workers):
+    """The shared PDF process pool, sized by the first caller (at least PDF_WORKERS)"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        # A pool inherited through fork belongs to the parent
+        if _pdf_pool is None or _pdf_pool[0] != os.getpid():
+            _pdf_pool = (os.getpid(), ProcessPoolExecutor(max_workers=max(workers, PDF_WORKERS)))
+        return _pdf_pool[1]
+
+def _discard_pdf_pool(executor):
+    """Drop a broken pool so the next large PDF starts a new one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None and _pdf_pool[1] is executor:
+            _pdf_pool = None
+
+def _iter_pdf_pages_parallel(file_path, page_count, workers):
+    """Extract page ranges in the shared process pool and yield page texts in order"""
+    chunk_size = -(-page_count // workers)
+    ranges = [(start, min(start + chunk_size, page_count))
+              for start in range(0, page_count, chunk_size)]
+    executor = _get_pdf_pool(workers)
+    futures = [executor.submit(_extract_pdf_page_range, file_path, start, stop)
+               for start, stop in ranges]
+    try:
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        _discard_pdf_pool(executor)
+        raise
+    finally:
+        # Ranges past a max_bytes cutoff are never needed
+        for future in futures:
+            future.cancel()
+
+def _extract_pdf_page_range(file_path, start, stop):
+    """Extract pages [start, stop) of a PDF (runs in a worker process)"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [_page_text(pdf_reader.pages[page_num]) for page_num in range(start, stop)]
 
 def extract_text_from_docx(file_path):
     """Extract text from DOCX file"""
@@ -124,7 +246,8 @@ def extract_structured_data_from_text(text):
     }
     
     # Use spaCy for NLP processing if available
-    if HAS_SPACY:
+    nlp = get_nlp() if HAS_SPACY else None
+    if nlp:
         doc = nlp(text)
         
         # Extract name
@@ -145,7 +268,7 @@ def extract_structured_data_from_text(text):
     data['phone'] = extract_phone(text)
     
     # Skills extraction
-    data['skills'] = extract_skills(doc if HAS_SPACY else None, text)
+    data['skills'] = extract_skills(doc if nlp else None, text)
     
     logging.debug(f"Extracted resume data: {str(data)}")
     return data
@@ -276,39 +399,51 @@ def load_expanded_skills():
     
     return set(all_skills)
 
+def load_matchable_skills():
+    """Return the dictionary skills that are safe to match verbatim"""
+    # Single-word skills of two characters or fewer ("R", "Go", "AI") are
+    # skipped to avoid false positives; multi-word skills are always kept
+    return {
+        skill for skill in load_expanded_skills()
+        if len(skill.split()) > 1 or (len(skill.split()) == 1 and len(skill) > 2)
+    }
+
+# Compiled once at import so every resume is scanned in a single pass
+skill_matcher = SkillMatcher(load_matchable_skills())
+
+def find_skill_mentions(text):
+    """
+    Find every dictionary skill mentioned in the text
+    
+    Args:
+        text (str): Resume or job description text
+    
+    Returns:
+        list: (skill, start, end) tuples in order of appearance
+    """
+    return skill_matcher.find_all(text)
+
 def extract_skills(doc, text):
     """Extract skills from text with ML assistance"""
     skills = set()
     
+    # Candidates for the ML classifier, checked together in one batch
+    ml_candidates = []
+    
     # Strategy 1: Use ML classifier if available
     if HAS_ML_PARSER:
         # Extract skills section
-        skills_section = extract_section(text, 
-                                     ["skills", "technical skills", "core competencies", 
-                                      "technologies", "qualifications", "expertise"])
+        skills_section = get_section(text, "skills")
         if skills_section:
             # Split by common delimiters and filter out non-skills
             candidates = re.split(r'[,.\n•|\t/&]', skills_section)
             for candidate in candidates:
                 skill = candidate.strip()
                 if skill and len(skill) > 1:
-                    # Use ML model to check if this is a skill
-                    if ml_parser.is_skill(skill):
-                        skills.add(skill)
-    
-    # Strategy 2: Use predefined list of common skills
-    expanded_skills = load_expanded_skills()
-    for skill in expanded_skills:
-        # Look for exact matches of multi-word skills
-        if len(skill.split()) > 1 and skill.lower() in text.lower():
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text, re.IGNORECASE):
-                skills.add(skill)
-        # For single-word skills, be more careful to avoid false positives
-        elif len(skill.split()) == 1 and len(skill) > 2:
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text, re.IGNORECASE):
-                skills.add(skill)
+                    ml_candidates.append(skill)
+    
+    # Strategy 2: Use predefined list of common skills (one pass over the text)
+    skills.update(skill_matcher.find_skills(text))
     
     # Strategy 3: Use named entities from spaCy if available
     if doc:
@@ -318,11 +453,15 @@ def extract_skills(doc, text):
                 # Verify this looks like a skill
                 if 2 <= len(ent.text.split()) <= 4 and len(ent.text) > 2:
                     if HAS_ML_PARSER:
-                        if ml_parser.is_skill(ent.text):
-                            skills.add(ent.text)
+                        ml_candidates.append(ent.text)
                     else:
                         skills.add(ent.text)
     
+    # Use ML model to check which candidates are skills
+    if ml_candidates:
+        verdicts = ml_parser.is_skill_batch(ml_candidates)
+        skills.update(skill for skill, is_skill in zip(ml_candidates, verdicts) if is_skill)
+    
     # Convert set to list and sort for consistent order
     return sorted(list(skills))
 
@@ -331,9 +470,7 @@ def extract_experience(doc, text):
     experiences = []
     
     # Strategy 1: Extract experience section
-    experience_section = extract_section(text, 
-                                       ["experience", "work experience", "professional experience", 
-                                        "employment history", "work history", "career history"])
+    experience_section = get_section(text, "experience")
     
     if not experience_section:
         return experiences
@@ -387,80 +524,145 @@ def extract_experience(doc, text):
     
     return experiences
 
-def extract_section(text, section_names):
+# Headers that can start a section; any of them ends the section before it
+COMMON_SECTIONS = [
+    "education", "experience", "work experience", "skills", "projects", 
+    "certifications", "awards", "publications", "languages", "interests",
+    "summary", "objective", "profile", "contact", "references", "volunteer",
+    "extracurricular", "technical skills", "professional experience"
+]
+
+# Header names that introduce each section looked up by the extractors
+SECTION_ALIASES = {
+    "skills": ["skills", "technical skills", "core competencies", 
+               "technologies", "qualifications", "expertise"],
+    "experience": ["experience", "work experience", "professional experience", 
+                   "employment history", "work history", "career history"]
+}
+
+# Every known header, matched in a single pass over the document
+section_header_matcher = SkillMatcher(
+    set(COMMON_SECTIONS).union(*SECTION_ALIASES.values())
+)
+
+_HEADER_COLON = re.compile(r'\s*:')
+
+@functools.lru_cache(maxsize=32)
+def find_section_headers(text):
     """
-    Extract text from a specific section of the resume
+    Find every section header in the text in one scan
+    
+    Cached per document, so extracting several sections from the same
+    resume only scans it once.
     
     Args:
         text (str): Full resume text
-        section_names (list): Possible names for the section
     
     Returns:
-        str: Text from the section or empty string if not found
+        tuple: (lowercased_text, headers) where headers maps each header
+            name to its (start, header_end) positions in order of appearance;
+            header_end includes a trailing colon when there is one
     """
     text = text.lower()
+    headers = {}
+    for name, start, end in section_header_matcher.find_all(text):
+        colon = _HEADER_COLON.match(text, end)
+        headers.setdefault(name, []).append((start, colon.end() if colon else end))
+    return text, headers
+
+@functools.lru_cache(maxsize=32)
+def _extra_header_matcher(names):
+    """Matcher for section names outside the known header vocabulary"""
+    return SkillMatcher(names)
+
+def extract_section(text, section_names):
+    """
+    Extract text from a specific section of the resume
     
-    section_patterns = []
-    for name in section_names:
-        # Create patterns that match section headers
-        # Examples: "SKILLS", "Skills:", "TECHNICAL SKILLS", etc.
-        patterns = [
-            rf'(?i)\b{re.escape(name)}\s*:',  # "Skills:"
-            rf'(?i)\b{re.escape(name)}\b',     # "Skills" as whole word
-            rf'(?i)\b{re.escape(name.upper())}\b',  # "SKILLS"
-            rf'(?i)\b{re.escape(name.title())}\b'   # "Skills"
-        ]
-        section_patterns.extend(patterns)
-    
-    # Find the start of the specified section
-    section_start = -1
-    section_name_found = ""
+    The section starts at the first header matching one of section_names
+    and ends at the next common section header after it.
     
-    for pattern in section_patterns:
-        match = re.search(pattern, text)
-        if match and (section_start == -1 or match.start() < section_start):
-            section_start = match.start()
-            section_name_found = match.group(0)
+    Args:
+        text (str): Full resume text
+        section_names (list): Possible names for the section
     
-    if section_start == -1:
+    Returns:
+        str: Text from the section or empty string if not found
+    """
+    span = find_section_span(text, section_names)
+    if span is None:
         return ""
     
-    # Find the start of the next section
-    next_section_start = len(text)
-    common_sections = [
-        "education", "experience", "work experience", "skills", "projects", 
-        "certifications", "awards", "publications", "languages", "interests",
-        "summary", "objective", "profile", "contact", "references", "volunteer",
-        "extracurricular", "technical skills", "professional experience"
-    ]
-    
-    # Exclude the section we're currently extracting
-    for name in section_names:
-        if name in common_sections:
-            common_sections.remove(name)
-    
-    # Create patterns for the next section
-    next_section_patterns = []
-    for name in common_sections:
-        patterns = [
-            rf'(?i)\b{re.escape(name)}\s*:',  # "Education:"
-            rf'(?i)\b{re.escape(name.upper())}\b',  # "EDUCATION"
-            rf'(?i)\b{re.escape(name.title())}\b'   # "Education"
-        ]
-        next_section_patterns.extend(patterns)
+    lowered, _ = find_section_headers(text)
     
-    # Find the closest next section
-    for pattern in next_section_patterns:
-        match = re.search(pattern, text[section_start + len(section_name_found):])
-        if match:
-            candidate_start = section_start + len(section_name_found) + match.start()
-            if candidate_start < next_section_start:
-                next_section_start = candidate_start
+    # Clean up the text
+    return lowered[span[0]:span[1]].strip()
+
+def find_section_span(text, section_names):
+    """
+    Locate a section in the (lowercased) resume text
     
-    # Extract the section text
-    section_text = text[section_start + len(section_name_found):next_section_start]
+    Returns:
+        tuple: (start, end) of the section body after its header, or None
+    """
+    lowered, headers = find_section_headers(text)
+    names = [name.lower() for name in section_names]
+    
+    unknown = tuple(sorted(set(names) - set(section_header_matcher.skills)))
+    if unknown:
+        headers = dict(headers)
+        for name, start, end in _extra_header_matcher(unknown).find_all(lowered):
+            colon = _HEADER_COLON.match(lowered, end)
+            headers.setdefault(name, []).append((start, colon.end() if colon else end))
+    
+    # Find the start of the specified section (earliest header; ties go to
+    # the name listed first)
+    best = None
+    for order, name in enumerate(names):
+        for start, header_end in headers.get(name, [])[:1]:
+            if best is None or (start, order) < best[:2]:
+                best = (start, order, header_end)
+    
+    if best is None:
+        return None
+    
+    body_start = best[2]
+    
+    # Find the start of the next section, excluding the one we're extracting
+    next_section_start = len(lowered)
+    for name in COMMON_SECTIONS:
+        if name in section_names:
+            continue
+        for start, _ in headers.get(name, []):
+            if start >= body_start:
+                next_section_start = min(next_section_start, start)
+                break
+    
+    return body_start, next_section_start
+
+@functools.lru_cache(maxsize=32)
+def segment_sections(text):
+    """
+    Map each known section of the resume to its span
     
-    # Clean up the text
-    section_text = section_text.strip()
+    Args:
+        text (str): Full resume text
     
-    return section_text
\ No newline at end of file
+    Returns:
+        dict: Section name -> (start, end) in the lowercased text, for the
+            sections in SECTION_ALIASES that are present
+    """
+    sections = {}
+    for section, names in SECTION_ALIASES.items():
+        span = find_section_span(text, names)
+        if span is not None:
+            sections[section] = span
+    return sections
+
+def get_section(text, section):
+    """Return the body of a SECTION_ALIASES section, or an empty string"""
+    span = segment_sections(text).get(section)
+    if span is None:
+        return ""
+    lowered, _ = find_section_headers(text)
+    return lowered[span[0]:span[1]].strip()
@@ -0,0 +1,157 @@
+from typing import Dict, List
+
+import numpy as np
+
+from utils.resume_record import ResumeRecord
+
+
+# Readable explanation of a score, as produced by the matcher agent
+def explain_score(total_score: float, shared_skills, education: str, skill_match: float) -> str:
+    return (
+        f"# Agent: Matcher\n"
+        f"## Final Answer:\n"
+        f"The compatibility score is {total_score}. "
+        f"The candidate possesses relevant skills like {', '.join(shared_skills) or 'none specified'}, "
+        f"and their {education} aligns with the job's educational requirements. "
+        f"The candidate's experience exceeds the minimum requirements which is a plus. "
+        f"The skills score is {'low' if skill_match < 0.5 else 'moderate to high'}."
+    )
+
+# Skills shared by a resume and a JD profile (dicts or ResumeRecords; records
+# sharing a vocabulary compare skill bitsets) and the fraction of JD skills covered
+def _shared_skills(resume_data, jd_data):
+    if (isinstance(resume_data, ResumeRecord) and isinstance(jd_data, ResumeRecord)
+            and resume_data.vocabulary is jd_data.vocabulary):
+        # Skill overlap is a bitwise AND plus popcount
+        jd_skill_count = jd_data.skill_count
+        skill_match = resume_data.shared_skills(jd_data) / jd_skill_count if jd_skill_count else 0
+        return resume_data.shared_skill_names(jd_data), skill_match
+
+    resume_skills = set(resume_data["skills"])
+    jd_skills = set(jd_data["skills"])
+    skill_match = len(resume_skills.intersection(jd_skills)) / len(jd_skills) if jd_skills else 0
+    return resume_skills.intersection(jd_skills), skill_match
+
+# Custom logic to compute score between resume and JD
+def compute_score(resume_data: Dict, jd_data: Dict) -> Dict:
+    shared_skills, skill_match = _shared_skills(resume_data, jd_data)
+
+    # Skills match scoring (max 50 points)
+    skills_score = skill_match * 50
+
+    # Experience match scoring (max 30 points)
+    exp_match = min(resume_data["experience"] / jd_data["experience"], 1.0) if jd_data["experience"] > 0 else 1.0
+    exp_score = exp_match * 30
+
+    # Education match scoring (max 20 points)
+    edu_match = 1.0 if jd_data["education"].lower() in resume_data["education"].lower() else 0.5
+    edu_score = edu_match * 20
+
+    # Final total score
+    total_score = min(round(skills_score + exp_score + edu_score, 2), 100)
+
+    # Generate a readable explanation
+    final_answer = explain_score(total_score, shared_skills, resume_data["education"], skill_match)
+
+    return {"score": total_score, "final_answer": final_answer}
+
+
+class ScoreBatch:
+    """
+    Scores of N resume profiles against one JD profile
+
+    ``scores`` holds every total score; ``batch[i]`` returns the same dict
+    as ``compute_score(resume_profiles[i], jd_data)``, building its
+    explanation text only when it is asked for.
+    """
+
+    def __init__(self, resume_profiles, jd_data, scores, skill_matches):
+        self.resume_profiles = resume_profiles
+        self.jd_data = jd_data
+        self.scores = scores
+        self.skill_matches = skill_matches
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, index):
+        resume_data = self.resume_profiles[index]
+        total_score = float(self.scores[index])
+        shared_skills, skill_match = _shared_skills(resume_data, self.jd_data)
+        return {
+            "score": total_score,
+            "final_answer": explain_score(total_score, shared_skills, resume_data["education"], skill_match)
+        }
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def top_k(self, k: int) -> List[int]:
+        """Indices of the k best scores, best first; ties keep input order"""
+        if k <= 0:
+            return []
+        order = np.argsort(-self.scores, kind="stable")
+        return order[:k].tolist()
+
+
+# Round to 2 decimals exactly like round(x, 2). np.round scales by 100 and
+# rounds to the nearest integer, which agrees with Python's correctly
+# rounded result except when x * 100 lands next to a .5 boundary, so
+# only those few values go through round()
+def _round2(values: np.ndarray) -> np.ndarray:
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_tie):
+        rounded[index] = round(float(values[index]), 2)
+    return rounded
+
+# True if numpy's float64 division gives the same result as Python's
+def _exact_float(value) -> bool:
+    return isinstance(value, float) or (isinstance(value, int) and abs(value) <= 2 ** 53)
+
+# Score N resume profiles against one JD profile with array arithmetic; the
+# result matches compute_score for every pair
+def compute_scores(resume_profiles: List[Dict], jd_data: Dict) -> ScoreBatch:
+    count = len(resume_profiles)
+
+    # Skills: shared-skill counts over the JD's skill set (bitsets for records)
+    jd_skills = set(jd_data["skills"])
+    jd_skill_count = len(jd_skills)
+    jd_record = isinstance(jd_data, ResumeRecord)
+    shared = np.fromiter(
+        (profile.shared_skills(jd_data)
+         if jd_record and isinstance(profile, ResumeRecord) and profile.vocabulary is jd_data.vocabulary
+         else len(jd_skills.intersection(profile["skills"]))
+         for profile in resume_profiles),
+        dtype=np.float64, count=count)
+    skill_matches = shared / jd_skill_count if jd_skill_count else np.zeros(count)
+    skills_scores = skill_matches * 50
+
+    # Experience: capped ratio to the required years
+    jd_experience = jd_data["experience"]
+    if jd_experience > 0:
+        experience = [profile["experience"] for profile in resume_profiles]
+        if _exact_float(jd_experience) and all(_exact_float(value) for value in experience):
+            exp_matches = np.minimum(np.array(experience, dtype=np.float64) / np.float64(jd_experience), 1.0)
+        else:
+            # Huge ints or other numbers; keep Python's division
+            exp_matches = np.array([min(value / jd_experience, 1.0) for value in experience], dtype=np.float64)
+    else:
+        exp_matches = np.ones(count)
+    exp_scores = exp_matches * 30
+
+    # Education: substring test, once per distinct resume education
+    jd_education = jd_data["education"].lower()
+    edu_by_education = {}
+    edu_matches = np.empty(count)
+    for index, profile in enumerate(resume_profiles):
+        education = profile["education"]
+        edu_match = edu_by_education.get(education)
+        if edu_match is None:
+            edu_match = edu_by_education[education] = 1.0 if jd_education in education.lower() else 0.5
+        edu_matches[index] = edu_match
+    edu_scores = edu_matches * 20
+
+    totals = np.minimum(_round2(skills_scores + exp_scores + edu_scores), 100)
+    return ScoreBatch(resume_profiles, jd_data, totals, skill_matches)
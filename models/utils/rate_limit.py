@@ -0,0 +1,90 @@
+import logging
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    each call takes one token and blocks until one is available, so bursts
+    of up to ``capacity`` calls go out at once and the sustained rate never
+    exceeds the provider quota.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1.0):
+        """Block until the requested tokens are available, then take them"""
+        if self.rate <= 0:
+            return  # Rate limiting disabled
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# HTTP statuses a retry can fix: request timeout, rate limit and server-side failures
+TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_transient_error(error):
+    """
+    True for errors worth retrying: rate limits, 5xx responses, timeouts and dropped connections
+
+    The HTTP status is read from ``code`` (google.api_core and urllib
+    errors) or ``status_code`` / ``response.status_code`` (HTTP client
+    errors). Auth, invalid-request and blocked-response errors are not
+    transient.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, "code", None)
+    if not isinstance(status, int):
+        status = getattr(error, "status_code", None)
+    if not isinstance(status, int):
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and status in TRANSIENT_STATUS_CODES
+
+
+def retry_with_backoff(func, max_retries=3, base_delay=0.5, max_delay=8.0, retry_on=(Exception,),
+                       retry_if=None):
+    """
+    Call func, retrying with exponential backoff and jitter on failure
+
+    Args:
+        func (callable): Zero-argument function to call
+        max_retries (int): Retries after the first attempt
+        base_delay (float): Delay before the first retry, in seconds
+        max_delay (float): Upper bound for a single delay, in seconds
+        retry_on (tuple): Exception types that trigger a retry
+        retry_if (callable): Optional predicate on the exception; errors it
+            rejects are raised at once instead of retried
+
+    Returns:
+        The return value of func; the last exception is raised once retries run out
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except retry_on as e:
+            if attempt >= max_retries or (retry_if is not None and not retry_if(e)):
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            logging.warning(f"Attempt {attempt + 1} failed ({str(e)}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,199 @@
+import os
+import sys
+import threading
+
+# Number of set bits in an int bitset (int.bit_count needs Python 3.10)
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+    def popcount(mask):
+        return bin(mask).count("1")
+
+
+class SkillVocabulary:
+    """
+    Interns skill names to dense integer ids
+
+    Seeded with a fixed vocabulary (sorted, so ids are the same in every
+    process); skills outside it are learned on first use until the
+    vocabulary holds ``max_size`` skills, after which new skills get no id.
+    A set of skills is encoded as an int bitset with bit i set for skill id
+    i, so the overlap of two skill sets is ``popcount(a & b)``. The cap
+    keeps bitsets from widening without bound on free-form skills.
+    """
+
+    def __init__(self, skills=(), max_size=None):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+        self.max_size = None
+        for skill in sorted(set(skills)):
+            self.intern(skill)
+        self.base_size = len(self._names)
+        self.max_size = max_size
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, skill):
+        """Id of skill, assigning the next free id to a new skill; None once the vocabulary is full"""
+        skill_id = self._ids.get(skill)
+        if skill_id is not None:
+            return skill_id
+        with self._lock:
+            skill_id = self._ids.get(skill)
+            if skill_id is None:
+                if self.max_size is not None and len(self._names) >= self.max_size:
+                    return None
+                skill_id = len(self._names)
+                self._names.append(sys.intern(skill))
+                self._ids[skill] = skill_id
+            return skill_id
+
+    def id_of(self, skill):
+        """Id of skill, or None if it was never interned"""
+        return self._ids.get(skill)
+
+    def name(self, skill_id):
+        return self._names[skill_id]
+
+    def encode(self, skills):
+        """Bitset of a collection of skill names (new skills are learned; skills without an id are left out)"""
+        return self.partition(skills)[0]
+
+    def partition(self, skills):
+        """(bitset of the skills with an id, frozenset of the skills that got none)"""
+        mask = 0
+        unknown = set()
+        for skill in skills:
+            skill_id = self.intern(skill)
+            if skill_id is None:
+                unknown.add(skill)
+            else:
+                mask |= 1 << skill_id
+        return mask, frozenset(unknown)
+
+    def decode(self, mask):
+        """Skill names in a bitset, in id order"""
+        names = []
+        # Visit only the set bits, lowest first; shifting through every id
+        # would cost one big-int shift per vocabulary entry
+        while mask:
+            low = mask & -mask
+            names.append(self._names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+
+# Skills the process-wide vocabulary learns beyond load_expanded_skills()
+SKILL_VOCABULARY_MAX_LEARNED = int(os.getenv("SKILL_VOCABULARY_MAX_LEARNED", "2048"))
+
+_default_vocabulary = None
+_default_vocabulary_lock = threading.Lock()
+
+
+def get_skill_vocabulary():
+    """Process-wide vocabulary seeded with utils.parser.load_expanded_skills()"""
+    global _default_vocabulary
+    if _default_vocabulary is None:
+        with _default_vocabulary_lock:
+            if _default_vocabulary is None:
+                from utils.parser import load_expanded_skills
+                seed = set(load_expanded_skills())
+                _default_vocabulary = SkillVocabulary(seed, max_size=len(seed) + SKILL_VOCABULARY_MAX_LEARNED)
+    return _default_vocabulary
+
+_NO_SKILLS = frozenset()
+
+
+class ResumeRecord:
+    """
+    Compact stand-in for a parsed resume or an extracted profile dict
+
+    Skills are held as a tuple of interned names in their original order
+    plus a bitset over a SkillVocabulary for overlap tests (skills the
+    vocabulary has no room for are kept in ``unknown_skills``), experience
+    lines as a tuple and repeated strings are interned, which takes a
+    fraction of the memory of the equivalent dict of lists. Records support
+    read-only mapping access (``record["skills"]``,
+    ``record.get("experience", [])``) and repr like the dict, so they can be
+    passed wherever the dicts are read.
+    """
+
+    __slots__ = ("name", "email", "phone", "skill_names", "skills_mask", "unknown_skills",
+                 "experience", "education", "vocabulary")
+
+    FIELDS = ("name", "email", "phone", "skills", "experience", "education")
+
+    def __init__(self, skills=(), experience=(), education=None, name=None, email=None, phone=None,
+                 vocabulary=None):
+        self.vocabulary = vocabulary if vocabulary is not None else get_skill_vocabulary()
+        self.skill_names = tuple(sys.intern(skill) if isinstance(skill, str) else skill for skill in skills)
+        self.skills_mask, unknown = self.vocabulary.partition(self.skill_names)
+        self.unknown_skills = unknown or _NO_SKILLS
+        # Parsed resumes have experience lines; LLM profiles have years
+        self.experience = tuple(experience) if isinstance(experience, list) else experience
+        self.education = sys.intern(education) if isinstance(education, str) else education
+        self.name = name
+        self.email = email
+        self.phone = phone
+
+    @classmethod
+    def from_dict(cls, data, vocabulary=None):
+        """Record from extract_structured_data_from_text or extract_with_llm output"""
+        return cls(
+            skills=data.get("skills", ()),
+            experience=data.get("experience", ()),
+            education=data.get("education"),
+            name=data.get("name"),
+            email=data.get("email"),
+            phone=data.get("phone"),
+            vocabulary=vocabulary,
+        )
+
+    @property
+    def skills(self):
+        return list(self.skill_names)
+
+    @property
+    def skill_count(self):
+        """Number of distinct skills"""
+        return popcount(self.skills_mask) + len(self.unknown_skills)
+
+    def shared_skills(self, other):
+        """Number of skills this record shares with another record over the same vocabulary"""
+        shared = popcount(self.skills_mask & other.skills_mask)
+        if self.unknown_skills and other.unknown_skills:
+            shared += len(self.unknown_skills & other.unknown_skills)
+        return shared
+
+    def shared_skill_names(self, other):
+        """Skills this record shares with another record over the same vocabulary"""
+        names = self.vocabulary.decode(self.skills_mask & other.skills_mask)
+        if self.unknown_skills and other.unknown_skills:
+            names.extend(sorted(self.unknown_skills & other.unknown_skills))
+        return names
+
+    def _value(self, key):
+        if key == "skills":
+            return self.skills
+        if key == "experience" and isinstance(self.experience, tuple):
+            return list(self.experience)
+        return getattr(self, key)
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS or (key != "skills" and getattr(self, key) is None):
+            raise KeyError(key)
+        return self._value(key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and (key == "skills" or getattr(self, key) is not None)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def to_dict(self):
+        return {key: self._value(key) for key in self.FIELDS if key in self}
+
+    def __repr__(self):
+        return repr(self.to_dict())
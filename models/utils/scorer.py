@@ -1,21 +1,60 @@
 import logging
 import re
 import string
-from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import heapq
+import threading
+from collections import Counter, OrderedDict
+from sklearn.feature_extraction.text import CountVectorizer
 import numpy as np
+from scipy.sparse import csr_matrix
+from utils.metrics import STAGE_SECONDS
+from utils.nlp_models import get_nlp, is_model_available
 
-# Try to import spaCy for better text processing
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    HAS_SPACY = True
+# spaCy for better text processing, loaded on first use and shared with the parser
+HAS_SPACY = is_model_available()
+if HAS_SPACY:
     logging.info("Using spaCy for enhanced text processing in scorer")
-except:
-    HAS_SPACY = False
+else:
     logging.warning("spaCy not available for enhanced scoring - falling back to basic processing")
 
+# Scoring only reads entities and noun chunks, so lemmas are never computed
+SCORING_DISABLED_COMPONENTS = ["lemmatizer"]
+
+class TextAnalysis:
+    """Entities and noun chunks of one spaCy Doc, shared by every scoring function"""
+    __slots__ = ("entities", "noun_chunks")
+
+    def __init__(self, doc):
+        # (lowercased text, label) pairs
+        self.entities = [(ent.text.lower(), ent.label_) for ent in doc.ents]
+        self.noun_chunks = [chunk.text.lower() for chunk in doc.noun_chunks]
+
+def analyze_texts(texts, batch_size=64):
+    """
+    Run texts through spaCy once with nlp.pipe
+    
+    Args:
+        texts (list): Texts to analyse
+        batch_size (int): Number of texts spaCy processes per batch
+    
+    Returns:
+        list: TextAnalysis per text, or None entries when spaCy is unavailable
+    """
+    nlp = get_nlp() if HAS_SPACY else None
+    if not nlp:
+        return [None] * len(texts)
+    
+    try:
+        disabled = [name for name in SCORING_DISABLED_COMPONENTS if name in nlp.pipe_names]
+        return [TextAnalysis(doc) for doc in nlp.pipe(texts, disable=disabled, batch_size=batch_size)]
+    except Exception as e:
+        logging.warning(f"Error analysing texts with spaCy: {str(e)}")
+        return [None] * len(texts)
+
+def analyze_text(text):
+    """Analyse a single text with spaCy (see analyze_texts)"""
+    return analyze_texts([text])[0]
+
 def score_resume_against_job(resume_data, job_description):
     """
     Score a resume against a job description
@@ -37,56 +76,234 @@ def score_resume_against_job(resume_data, job_description):
     # Extract experience from resume
     resume_experience = resume_data.get('experience', [])
     
-    # Extract other info
-    resume_name = resume_data.get('name', '')
-    resume_email = resume_data.get('email', '')
-    
     # Combine all resume data into a single text for comprehensive analysis
-    resume_text = " ".join([
-        resume_name,
-        resume_email,
-        " ".join(resume_skills),
-        " ".join(resume_experience)
-    ])
+    resume_text = build_resume_text(resume_data)
     
     # Clean and normalize text
     resume_text = clean_text(resume_text)
     job_description = clean_text(job_description)
     
+    # Run spaCy once per text and share the results between scorers
+    with STAGE_SECONDS.time(stage="scorer_analysis"):
+        job_analysis, resume_analysis = analyze_texts([job_description, resume_text])
+    
     # Calculate skill match scores
-    skills_match = calculate_skills_match(resume_skills, job_description)
+    with STAGE_SECONDS.time(stage="scorer_skills_match"):
+        skills_match = calculate_skills_match(resume_skills, job_description, job_analysis)
     
     # Calculate content match with TF-IDF and NLP
-    content_match_score = calculate_content_match(resume_text, job_description)
+    with STAGE_SECONDS.time(stage="scorer_content_match"):
+        content_match_score = calculate_content_match(resume_text, job_description,
+                                                      resume_analysis, job_analysis)
     
     # No longer extracting key terms since this feature was removed
     
-    # Calculate skill coverage percentage
-    skill_coverage = len(skills_match) / max(len(resume_skills), 1) * 100 if resume_skills else 0
-    
     # Calculate experience relevance
     experience_text = " ".join(resume_experience)
-    exp_relevance = 0
-    if experience_text and job_description:
-        # Simple TF-IDF vectorization for experience relevance
-        try:
-            vectorizer = TfidfVectorizer(stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform([experience_text, job_description])
-            exp_relevance = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0] * 100
-        except:
-            exp_relevance = 0
+    with STAGE_SECONDS.time(stage="scorer_experience_relevance"):
+        exp_relevance = calculate_experience_relevance_batch([experience_text], job_description)[0]
+    
+    return combine_scores(resume_skills, skills_match, content_match_score, exp_relevance)
+
+def score_resumes_against_job(resumes_data, job_description):
+    """
+    Score a batch of resumes against one job description
+    
+    Terms are counted once over the whole batch and every cosine
+    similarity comes from a few sparse products, instead of two vectorizer
+    fits per resume. IDF weights are still those of each (resume, JD) pair
+    (see pair_tfidf_cosines), so every score is the one
+    score_resume_against_job gives and doesn't depend on the rest of the batch.
+    
+    Args:
+        resumes_data (list): Parsed resume data dicts
+        job_description (str): Job description text
+    
+    Returns:
+        list: (score, details) tuples in the same order as resumes_data
+    """
+    logging.debug(f"Scoring {len(resumes_data)} resumes against job description")
+    
+    return [(score, details) for score, details in iter_batch_scores(resumes_data, job_description)]
+
+def iter_batch_scores(resumes_data, job_description):
+    """
+    Yield (score, details) for each resume, in order, from batched components
+    
+    spaCy, content TF-IDF and experience TF-IDF run once over the whole
+    batch up front; skill matches and score details are built per resume as
+    the generator is consumed.
+    """
+    for score, skills_match in iter_batch_matches(resumes_data, job_description):
+        yield score, score_details(score, skills_match)
+
+def iter_batch_matches(resumes_data, job_description):
+    """Like iter_batch_scores, but yield (score, skills_match) without building details"""
+    if not resumes_data:
+        return
+    
+    job_description = clean_text(job_description)
+    resume_texts = [clean_text(build_resume_text(data)) for data in resumes_data]
+    experience_texts = [" ".join(data.get('experience', [])) for data in resumes_data]
+    
+    # One spaCy pass over the JD and every resume, shared by all scorers
+    # (batch stages are timed per batch, not per resume)
+    with STAGE_SECONDS.time(stage="batch_analysis"):
+        analyses = analyze_texts([job_description] + resume_texts)
+    job_analysis, resume_analyses = analyses[0], analyses[1:]
+    
+    with STAGE_SECONDS.time(stage="batch_content_match"):
+        content_scores = calculate_content_match_batch(resume_texts, job_description,
+                                                       resume_analyses, job_analysis)
+    with STAGE_SECONDS.time(stage="batch_experience_relevance"):
+        exp_relevances = calculate_experience_relevance_batch(experience_texts, job_description)
+    
+    for i, data in enumerate(resumes_data):
+        resume_skills = data.get('skills', [])
+        skills_match = calculate_skills_match(resume_skills, job_description, job_analysis)
+        yield total_score(skills_match, content_scores[i], exp_relevances[i]), skills_match
+
+def rank_resumes_against_job(resumes_data, job_description, top_k):
+    """
+    Return only the top_k resumes for a job description, best first
+    
+    Component scores are computed in bulk like score_resumes_against_job,
+    but candidates stream through a bounded min-heap of size top_k, so no
+    full sort is done and score details are only built for the top_k.
+    
+    Args:
+        resumes_data (list): Parsed resume data dicts
+        job_description (str): Job description text
+        top_k (int): Number of candidates to return
+    
+    Returns:
+        list: (index, score, details) for the best top_k resumes, where index
+            is the position in resumes_data; ties keep input order
+    """
+    if top_k <= 0:
+        return []
+    return with_details(top_k_scores(iter_batch_matches(resumes_data, job_description), top_k))
+
+def top_k_scores(scores, top_k):
+    """
+    Keep the top_k of a stream of (score, details), best first
+    
+    Returns:
+        list: (index, score, details) where index is the position in the
+            stream; ties keep stream order
+    """
+    # Min-heap keyed by (score, -index): the root is the weakest kept candidate
+    heap = []
+    for i, (score, details) in enumerate(scores):
+        entry = (score, -i, details)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    
+    return [(-neg_index, score, details)
+            for score, neg_index, details in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+def with_details(ranked):
+    """Turn top_k_scores output over (score, skills_match) into (index, score, details)"""
+    return [(index, score, score_details(score, skills_match)) for index, score, skills_match in ranked]
+
+def iter_matrix_scores(resumes_data, job_descriptions):
+    """
+    Yield, for each job description, a generator of (score, details) per resume
     
+    Resumes are cleaned and analysed once for all job descriptions; content
+    and experience TF-IDF are each fitted once over every resume and job
+    description, and all M x N similarities come from one sparse matrix
+    product. Skill matches reuse each job description's term index. With a
+    single job description the scores equal score_resumes_against_job.
+    """
+    for job_matches in iter_matrix_matches(resumes_data, job_descriptions):
+        yield ((score, score_details(score, skills_match)) for score, skills_match in job_matches)
+
+def iter_matrix_matches(resumes_data, job_descriptions):
+    """Like iter_matrix_scores, but yield (score, skills_match) without building details"""
+    if not job_descriptions:
+        return
+    
+    job_texts = [clean_text(job_description) for job_description in job_descriptions]
+    resume_texts = [clean_text(build_resume_text(data)) for data in resumes_data]
+    experience_texts = [" ".join(data.get('experience', [])) for data in resumes_data]
+    
+    # One spaCy pass over every JD and resume
+    with STAGE_SECONDS.time(stage="matrix_analysis"):
+        analyses = analyze_texts(job_texts + resume_texts)
+    job_analyses, resume_analyses = analyses[:len(job_texts)], analyses[len(job_texts):]
+    
+    with STAGE_SECONDS.time(stage="matrix_content_match"):
+        content_scores = calculate_content_match_matrix(resume_texts, job_texts,
+                                                        resume_analyses, job_analyses)
+    with STAGE_SECONDS.time(stage="matrix_experience_relevance"):
+        exp_relevances = calculate_experience_relevance_matrix(experience_texts, job_texts)
+    
+    def job_scores(j):
+        job_index = get_job_term_index(job_texts[j], job_analyses[j])
+        for i, data in enumerate(resumes_data):
+            resume_skills = data.get('skills', [])
+            skills_match = calculate_skills_match(resume_skills, job_texts[j], job_index=job_index)
+            yield total_score(skills_match, content_scores[j, i], exp_relevances[j, i]), skills_match
+    
+    for j in range(len(job_texts)):
+        yield job_scores(j)
+
+def score_matrix(resumes_data, job_descriptions):
+    """
+    Score every resume against every job description
+    
+    Args:
+        resumes_data (list): Parsed resume data dicts (N)
+        job_descriptions (list): Job description texts (M)
+    
+    Returns:
+        numpy.ndarray: M x N matrix of final scores (0-100)
+    """
+    scores = np.zeros((len(job_descriptions), len(resumes_data)), dtype=int)
+    for j, job_matches in enumerate(iter_matrix_matches(resumes_data, job_descriptions)):
+        scores[j] = [score for score, _ in job_matches]
+    return scores
+
+def rank_matrix(resumes_data, job_descriptions, top_k):
+    """
+    Top top_k resumes for each job description, sharing work across JDs
+    
+    Returns:
+        list: One list per job description of (index, score, details),
+            best first (see rank_resumes_against_job)
+    """
+    if top_k <= 0:
+        return [[] for _ in job_descriptions]
+    return [with_details(top_k_scores(job_matches, top_k))
+            for job_matches in iter_matrix_matches(resumes_data, job_descriptions)]
+
+def build_resume_text(resume_data):
+    """Combine the parsed resume fields into a single text for analysis"""
+    return " ".join([
+        resume_data.get('name', ''),
+        resume_data.get('email', ''),
+        " ".join(resume_data.get('skills', [])),
+        " ".join(resume_data.get('experience', []))
+    ])
+
+def combine_scores(resume_skills, skills_match, content_match_score, exp_relevance):
+    """
+    Combine the component scores into the final score and details
+    
+    Returns:
+        tuple: (score, details)
+    """
+    final_score = total_score(skills_match, content_match_score, exp_relevance)
+    return final_score, score_details(final_score, skills_match)
+
+def total_score(skills_match, content_match_score, exp_relevance):
+    """Final 0-100 score from the component scores"""
     # Calculate detailed scores
     skills_score = sum(skills_match.values()) / max(len(skills_match), 1) * 100 if skills_match else 0
     
-    # Create detailed breakdown for the report
-    score_components = {
-        "skills_score": round(skills_score, 1),
-        "content_match": round(content_match_score, 1),
-        "skill_coverage": round(skill_coverage, 1),
-        "experience_relevance": round(exp_relevance, 1)
-    }
-    
     # Calculate final score (weighted average with adjusted weights)
     # 50% for skills match, 30% for content match, 20% for experience relevance
     final_score = int((0.5 * skills_score) + 
@@ -94,8 +311,10 @@ def score_resume_against_job(resume_data, job_description):
                       (0.2 * exp_relevance))
     
     # Ensure score is between 0 and 100
-    final_score = max(0, min(100, final_score))
-    
+    return max(0, min(100, final_score))
+
+def score_details(final_score, skills_match):
+    """Result dict (score, matched skills and category label) for a final score"""
     # Create detailed result dictionary - simplified without key terms
     details = {
         "score": final_score,
@@ -114,7 +333,7 @@ def score_resume_against_job(resume_data, job_description):
     else:
         details["category"] = "Poor Match"
     
-    return final_score, details
+    return details
 
 def clean_text(text):
     """Clean and normalize text for better comparison"""
@@ -129,40 +348,77 @@ def clean_text(text):
     
     return text
 
-def calculate_skills_match(resume_skills, job_description):
+# JD term indexes reused across candidates, keyed by (cleaned JD, spaCy on/off)
+JOB_TERM_INDEX_CACHE_SIZE = 32
+# Distinct skills whose scores one JobTermIndex memoises
+JOB_TERM_SCORE_CACHE_SIZE = 4096
+_job_term_indexes = OrderedDict()
+_job_term_indexes_lock = threading.Lock()
+
+class JobTermIndex:
     """
-    Calculate how well the resume skills match with job description
-    
-    Returns:
-        dict: Dictionary of skills with match scores (0.0-1.0)
+    Per-JD state shared by every calculate_skills_match call against that JD
+    
+    Holds the lowercased JD and its skill-like entities and noun chunks
+    (each joined into one string), so the JD is analysed once rather than
+    per candidate. Lookups stay the substring tests calculate_skills_match
+    always used, run as single C-level str scans, and scores are memoised
+    per skill (up to JOB_TERM_SCORE_CACHE_SIZE), so a skill shared by many
+    candidates is only scored once per JD. Nothing is built ahead of the
+    first lookup, so one-off pairs pay no indexing cost.
     """
-    skills_match = {}
-    job_desc_lower = job_description.lower()
     
-    # Enhanced skill detection with NLP if available
-    job_entities = []
-    job_keywords = []
+    # Joins entities/noun chunks into one string; skills never contain it
+    SEPARATOR = "\x00"
     
-    if HAS_SPACY:
-        try:
+    def __init__(self, job_description, job_analysis=None):
+        self.text = job_description.lower()
+        self.has_context = HAS_SPACY
+        self._scores = {}
+        
+        # Enhanced skill detection with NLP if available
+        job_entities = []
+        job_keywords = []
+        if HAS_SPACY:
             # Process job description with spaCy for better context
-            job_doc = nlp(job_description)
-            
-            # Extract key entities that might be related to skills
-            job_entities = [
-                ent.text.lower() for ent in job_doc.ents 
-                if ent.label_ in ["ORG", "PRODUCT", "WORK_OF_ART", "GPE"]
-            ]
-            
-            # Extract noun chunks as potential multi-word skills
-            job_keywords = [chunk.text.lower() for chunk in job_doc.noun_chunks]
+            if job_analysis is None:
+                job_analysis = analyze_text(job_description)
             
-            logging.debug(f"Extracted {len(job_entities)} entities and {len(job_keywords)} keywords from job description")
-        except Exception as e:
-            logging.warning(f"Error using spaCy for skill matching: {str(e)}")
-    
-    for skill in resume_skills:
+            if job_analysis:
+                # Extract key entities that might be related to skills
+                job_entities = [
+                    text for text, label in job_analysis.entities
+                    if label in ["ORG", "PRODUCT", "WORK_OF_ART", "GPE"]
+                ]
+                
+                # Extract noun chunks as potential multi-word skills
+                job_keywords = job_analysis.noun_chunks
+                
+                logging.debug(f"Extracted {len(job_entities)} entities and {len(job_keywords)} keywords from job description")
+        
+        self.entities = job_entities
+        self.keywords = job_keywords
+        self.entity_text = self.SEPARATOR.join(job_entities)
+        self.keyword_text = self.SEPARATOR.join(job_keywords)
+    
+    def _in_terms(self, skill_lower, terms, joined):
+        """True if skill_lower is a substring of one of terms"""
+        if self.SEPARATOR in skill_lower or not skill_lower:
+            return any(skill_lower in term for term in terms)
+        return skill_lower in joined
+    
+    def score(self, skill):
+        """Unrounded match score (0.0-1.0) of one resume skill against the JD"""
         skill_lower = skill.lower()
+        score = self._scores.get(skill_lower)
+        if score is None:
+            score = self._score(skill_lower)
+            if len(self._scores) < JOB_TERM_SCORE_CACHE_SIZE:
+                self._scores[skill_lower] = score
+        return score
+    
+    def _score(self, skill_lower):
+        text = self.text
         
         # Initialize scores
         exact_match_score = 0
@@ -170,27 +426,23 @@ def calculate_skills_match(resume_skills, job_description):
         context_score = 0
         
         # 1. Check for exact matches in the job description
-        if skill_lower in job_desc_lower:
+        first_pos = text.find(skill_lower)
+        if first_pos > -1:
             # Calculate importance score based on frequency and position
             # Position: Earlier mentions might be more important
-            position_score = 1.0
-            first_pos = job_desc_lower.find(skill_lower)
-            if first_pos > -1:
-                # Normalize position (earlier is better)
-                position_score = 1.0 - (first_pos / len(job_desc_lower))
+            position_score = 1.0 - (first_pos / len(text)) if text else 1.0
             
             # Frequency: More mentions might indicate importance
-            frequency = job_desc_lower.count(skill_lower)
+            frequency = text.count(skill_lower)
             frequency_score = min(frequency / 3, 1.0)  # Cap at 1.0
             
             exact_match_score = (0.7 * frequency_score + 0.3 * position_score)
         
         # 2. Check for word proximity matches (for multi-word skills)
         if ' ' in skill_lower and not exact_match_score:
-            skill_words = skill_lower.split()
-            if all(word in job_desc_lower for word in skill_words):
+            word_positions = [text.find(word) for word in skill_lower.split()]
+            if all(position > -1 for position in word_positions):
                 # Calculate average distance between words
-                word_positions = [job_desc_lower.find(word) for word in skill_words]
                 avg_distance = sum([abs(word_positions[i] - word_positions[i-1]) 
                                   for i in range(1, len(word_positions))]) / max(1, len(word_positions) - 1)
                 
@@ -198,19 +450,64 @@ def calculate_skills_match(resume_skills, job_description):
                 proximity_score = 1.0 / (1.0 + (avg_distance / 100))
         
         # 3. Add context-based matching with NLP entities (if available)
-        if HAS_SPACY and not (exact_match_score or proximity_score):
-            # Check if skill is part of extracted entities or keywords
-            if any(skill_lower in entity for entity in job_entities):
+        if self.has_context and not (exact_match_score or proximity_score):
+            # Check if skill is part of extracted entities or keywords. A
+            # partial match inside a longer term is already an entity or
+            # keyword match, so it needs no separate check
+            if self._in_terms(skill_lower, self.entities, self.entity_text):
                 context_score = 0.8  # High score for entity match
-            elif any(skill_lower in keyword for keyword in job_keywords):
+            elif self._in_terms(skill_lower, self.keywords, self.keyword_text):
                 context_score = 0.6  # Medium score for keyword match
-            # Check for partial matches in longer terms
-            elif any(skill_lower in entity and len(entity) > len(skill_lower) + 3 
-                    for entity in job_entities + job_keywords):
-                context_score = 0.4  # Lower score for partial match
         
         # Combine all scores and take the maximum
-        combined_score = max(exact_match_score, proximity_score, context_score)
+        return max(exact_match_score, proximity_score, context_score)
+
+def get_job_term_index(job_description, job_analysis=None):
+    """
+    Cached JobTermIndex for a cleaned job description
+    
+    Args:
+        job_description (str): Cleaned job description text
+        job_analysis (TextAnalysis): Precomputed spaCy analysis, only used
+            when the index isn't cached yet
+    
+    Returns:
+        JobTermIndex: Index shared by every candidate scored against the JD
+    """
+    key = (job_description, HAS_SPACY)
+    with _job_term_indexes_lock:
+        if key in _job_term_indexes:
+            _job_term_indexes.move_to_end(key)
+            return _job_term_indexes[key]
+    
+    job_index = JobTermIndex(job_description, job_analysis)
+    with _job_term_indexes_lock:
+        _job_term_indexes[key] = job_index
+        while len(_job_term_indexes) > JOB_TERM_INDEX_CACHE_SIZE:
+            _job_term_indexes.popitem(last=False)
+    return job_index
+
+def calculate_skills_match(resume_skills, job_description, job_analysis=None, job_index=None):
+    """
+    Calculate how well the resume skills match with job description
+    
+    Args:
+        resume_skills (list): Skills from the parsed resume
+        job_description (str): Job description text
+        job_analysis (TextAnalysis): Precomputed spaCy analysis of the job
+            description; computed here when omitted
+        job_index (JobTermIndex): Precomputed term index of the job
+            description; looked up in the per-JD cache when omitted
+    
+    Returns:
+        dict: Dictionary of skills with match scores (0.0-1.0)
+    """
+    if job_index is None:
+        job_index = get_job_term_index(job_description, job_analysis)
+    
+    skills_match = {}
+    for skill in resume_skills:
+        combined_score = job_index.score(skill)
         
         # Only include skills with non-zero scores
         if combined_score > 0:
@@ -218,79 +515,294 @@ def calculate_skills_match(resume_skills, job_description):
     
     return skills_match
 
-def calculate_content_match(resume_text, job_description):
+def calculate_content_match(resume_text, job_description, resume_analysis=None, job_analysis=None):
     """
     Calculate similarity between resume text and job description using TF-IDF and cosine similarity
     
+    Args:
+        resume_text (str): Cleaned resume text
+        job_description (str): Cleaned job description text
+        resume_analysis (TextAnalysis): Precomputed spaCy analysis of the resume
+        job_analysis (TextAnalysis): Precomputed spaCy analysis of the job description
+    
     Returns:
         float: Similarity score (0-100)
     """
     # Process with spaCy for NLP enhancements if available
-    resume_keywords = []
-    job_keywords = []
+    resume_text, resume_keywords = enrich_with_nlp(resume_text, resume_analysis)
+    job_description, job_keywords = enrich_with_nlp(job_description, job_analysis)
+    
+    try:
+        # TF-IDF cosine similarity with IDF fitted on this pair
+        cosine_sim = pair_tfidf_cosines([resume_text], [job_description], create_content_vectorizer())[0, 0]
+        
+        return combine_content_scores(cosine_sim, resume_keywords, job_keywords)
+    except Exception as e:
+        logging.error(f"Error calculating content match: {str(e)}")
+        return 0
+
+def calculate_content_match_batch(resume_texts, job_description, resume_analyses=None, job_analysis=None):
+    """
+    Calculate content similarity for many resumes against one job description
+    
+    Terms are counted once for all resumes plus the job description and
+    the cosine similarities come from sparse products (pair_tfidf_cosines).
+    Each score equals calculate_content_match for that resume alone.
+    
+    Args:
+        resume_texts (list): Cleaned resume texts
+        job_description (str): Cleaned job description text
+        resume_analyses (list): Precomputed TextAnalysis per resume
+        job_analysis (TextAnalysis): Precomputed analysis of the job description
+    
+    Returns:
+        numpy.ndarray: Similarity scores (0-100), one per resume
+    """
+    scores = np.zeros(len(resume_texts))
+    if not resume_texts:
+        return scores
+    
+    if resume_analyses is None:
+        analyses = analyze_texts([job_description] + list(resume_texts))
+        job_analysis, resume_analyses = analyses[0], analyses[1:]
+    
+    job_description, job_keywords = enrich_with_nlp(job_description, job_analysis)
+    enriched = [enrich_with_nlp(text, analysis) for text, analysis in zip(resume_texts, resume_analyses)]
     
+    try:
+        cosine_sims = pair_tfidf_cosines([text for text, _ in enriched], [job_description],
+                                         create_content_vectorizer())[0]
+    except Exception as e:
+        logging.error(f"Error calculating batch content match: {str(e)}")
+        return scores
+    
+    for i, (_, resume_keywords) in enumerate(enriched):
+        scores[i] = combine_content_scores(cosine_sims[i], resume_keywords, job_keywords)
+    return scores
+
+def calculate_content_match_matrix(resume_texts, job_descriptions, resume_analyses=None, job_analyses=None):
+    """
+    Content similarity of every resume against every job description
+    
+    Terms are counted once for all resumes plus all job descriptions, and
+    the cosine similarities of every pair come from a few sparse products
+    (pair_tfidf_cosines). Each entry equals calculate_content_match for
+    that pair alone.
+    
+    Args:
+        resume_texts (list): Cleaned resume texts (N)
+        job_descriptions (list): Cleaned job description texts (M)
+        resume_analyses (list): Precomputed TextAnalysis per resume
+        job_analyses (list): Precomputed TextAnalysis per job description
+    
+    Returns:
+        numpy.ndarray: M x N similarity scores (0-100)
+    """
+    scores = np.zeros((len(job_descriptions), len(resume_texts)))
+    if not resume_texts or not job_descriptions:
+        return scores
+    
+    if resume_analyses is None or job_analyses is None:
+        analyses = analyze_texts(list(job_descriptions) + list(resume_texts))
+        job_analyses, resume_analyses = analyses[:len(job_descriptions)], analyses[len(job_descriptions):]
+    
+    enriched_jobs = [enrich_with_nlp(text, analysis) for text, analysis in zip(job_descriptions, job_analyses)]
+    enriched = [enrich_with_nlp(text, analysis) for text, analysis in zip(resume_texts, resume_analyses)]
+    
+    try:
+        cosine_sims = pair_tfidf_cosines([text for text, _ in enriched], [text for text, _ in enriched_jobs],
+                                         create_content_vectorizer())
+    except Exception as e:
+        logging.error(f"Error calculating content match matrix: {str(e)}")
+        return scores
+    
+    # Key-term bonus (see combine_content_scores): shared distinct noun
+    # chunks per pair, counted with one product of binary keyword matrices
+    additional = np.zeros_like(scores)
     if HAS_SPACY:
-        try:
-            # Process with spaCy
-            resume_doc = nlp(resume_text)
-            job_doc = nlp(job_description)
-            
+        keyword_ids = {}
+        def keyword_matrix(keyword_lists):
+            rows, cols = [], []
+            for row, keywords in enumerate(keyword_lists):
+                for keyword in set(keywords):
+                    rows.append(row)
+                    cols.append(keyword_ids.setdefault(keyword, len(keyword_ids)))
+            return rows, cols
+        
+        job_keywords = [keywords for _, keywords in enriched_jobs]
+        resume_keywords = [keywords for _, keywords in enriched]
+        job_entries, resume_entries = keyword_matrix(job_keywords), keyword_matrix(resume_keywords)
+        if keyword_ids:
+            job_matrix = csr_matrix((np.ones(len(job_entries[0])), job_entries),
+                                    shape=(len(job_keywords), len(keyword_ids)))
+            resume_matrix = csr_matrix((np.ones(len(resume_entries[0])), resume_entries),
+                                       shape=(len(resume_keywords), len(keyword_ids)))
+            common = (job_matrix @ resume_matrix.T).toarray()
+            job_lengths = np.array([max(len(keywords), 1) for keywords in job_keywords], dtype=float)[:, None]
+            keyword_match = np.minimum(common / job_lengths * 100, 100)
+            additional = np.where(common > 0, keyword_match * 0.3, 0)
+    
+    # Same arithmetic as combine_content_scores, element-wise
+    weighted_scores = (cosine_sims * 100 * 0.7) + additional
+    return np.minimum(weighted_scores * 1.1, 100)
+
+def calculate_experience_relevance_matrix(experience_texts, job_descriptions):
+    """
+    Experience relevance (0-100) of every resume against every job description
+    
+    Returns:
+        numpy.ndarray: M x N relevance scores, 0 for resumes without
+            experience and for empty job descriptions
+    """
+    relevances = np.zeros((len(job_descriptions), len(experience_texts)))
+    rows = [i for i, text in enumerate(experience_texts) if text]
+    cols = [j for j, text in enumerate(job_descriptions) if text]
+    if not rows or not cols:
+        return relevances
+    
+    try:
+        similarities = pair_tfidf_cosines([experience_texts[i] for i in rows],
+                                          [job_descriptions[j] for j in cols],
+                                          create_experience_vectorizer()) * 100
+        relevances[np.ix_(cols, rows)] = similarities
+    except Exception as e:
+        logging.warning(f"Error calculating experience relevance matrix: {str(e)}")
+    return relevances
+
+def calculate_experience_relevance_batch(experience_texts, job_description):
+    """
+    Calculate experience relevance (0-100) for many resumes with one term count
+    
+    IDF weights are those of each (experience, JD) pair, as when scoring
+    one resume (see pair_tfidf_cosines).
+    
+    Returns:
+        numpy.ndarray: Relevance scores, 0 for resumes without experience
+    """
+    relevances = np.zeros(len(experience_texts))
+    rows = [i for i, text in enumerate(experience_texts) if text]
+    if not rows or not job_description:
+        return relevances
+    
+    try:
+        relevances[rows] = pair_tfidf_cosines([experience_texts[i] for i in rows], [job_description],
+                                              create_experience_vectorizer())[0] * 100
+    except Exception as e:
+        logging.warning(f"Error calculating batch experience relevance: {str(e)}")
+    return relevances
+
+def create_content_vectorizer():
+    """
+    Create the term counter used for content matching (TF-IDF via pair_tfidf_cosines)
+    
+    There is no max_df: with IDF fitted on a (resume, JD) pair, every term
+    the two share has a document frequency of 1.0, so any max_df below 1
+    drops exactly the terms that make them similar.
+    """
+    return CountVectorizer(
+        stop_words='english',
+        ngram_range=(1, 2),  # Include bigrams
+        min_df=1             # Minimum document frequency
+    )
+
+def create_experience_vectorizer():
+    """Create the term counter used for experience relevance"""
+    return CountVectorizer(stop_words='english')
+
+# Smooth IDF (as in TfidfTransformer) of a term found in only one document
+# of a two-document corpus; a term found in both has an IDF of 1
+PAIR_ONLY_IDF = np.log(3 / 2) + 1
+
+def pair_tfidf_cosines(resume_texts, job_texts, vectorizer):
+    """
+    TF-IDF cosine similarity of every resume with every job description
+    
+    Each similarity uses IDF weights fitted on that (resume, JD) pair
+    alone, as fitting a TfidfVectorizer on just the two texts would, so a
+    score never depends on the other texts it was computed with. In a pair
+    a term's IDF is either 1 (shared) or PAIR_ONLY_IDF, so the whole matrix
+    follows from raw term counts with a few sparse products.
+    
+    Args:
+        resume_texts (list): Resume texts (N)
+        job_texts (list): Job description texts (M)
+        vectorizer (CountVectorizer): Term counter defining the analyzer
+    
+    Returns:
+        numpy.ndarray: M x N cosine similarities (0-1)
+    
+    Raises:
+        ValueError: If no text has any countable term
+    """
+    counts = vectorizer.fit_transform(list(resume_texts) + list(job_texts)).tocsr().astype(np.float64)
+    resumes, jobs = counts[:len(resume_texts)], counts[len(resume_texts):]
+    resume_squares, job_squares = resumes.multiply(resumes).tocsr(), jobs.multiply(jobs).tocsr()
+    resume_terms, job_terms = (resumes > 0).astype(np.float64), (jobs > 0).astype(np.float64)
+    
+    # Shared terms have IDF 1, so the dot product is over raw counts
+    dots = (jobs @ resumes.T).toarray()
+    # Squared norms: every term at PAIR_ONLY_IDF, less the excess on shared terms
+    only_squared, excess = PAIR_ONLY_IDF ** 2, PAIR_ONLY_IDF ** 2 - 1
+    resume_norms = (only_squared * np.asarray(resume_squares.sum(axis=1)).ravel()[np.newaxis, :]
+                    - excess * (job_terms @ resume_squares.T).toarray())
+    job_norms = (only_squared * np.asarray(job_squares.sum(axis=1)).ravel()[:, np.newaxis]
+                 - excess * (job_squares @ resume_terms.T).toarray())
+    norms = np.sqrt(np.maximum(resume_norms, 0) * np.maximum(job_norms, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(norms > 0, dots / norms, 0.0)
+
+def enrich_with_nlp(text, analysis=None):
+    """
+    Append spaCy entities and noun chunks to a text for improved matching
+    
+    Args:
+        text (str): Text to enrich
+        analysis (TextAnalysis): Precomputed analysis; computed here when omitted
+    
+    Returns:
+        tuple: (enriched_text, noun_chunk_keywords)
+    """
+    keywords = []
+    
+    if HAS_SPACY:
+        if analysis is None:
+            analysis = analyze_text(text)
+        
+        if analysis:
             # Extract entities and noun chunks
-            resume_entities = [ent.text.lower() for ent in resume_doc.ents]
-            job_entities = [ent.text.lower() for ent in job_doc.ents]
+            entities = [ent_text for ent_text, _ in analysis.entities]
             
             # Get noun chunks (multi-word phrases that could be important)
-            resume_keywords = [chunk.text.lower() for chunk in resume_doc.noun_chunks]
-            job_keywords = [chunk.text.lower() for chunk in job_doc.noun_chunks]
+            keywords = analysis.noun_chunks
             
-            # Add these to the texts for improved matching
-            resume_text += " " + " ".join(resume_entities + resume_keywords)
-            job_description += " " + " ".join(job_entities + job_keywords)
+            # Add these to the text for improved matching
+            text += " " + " ".join(entities + keywords)
             
             logging.debug("Enhanced content matching with NLP-extracted entities and keywords")
-        except Exception as e:
-            logging.warning(f"Error using spaCy for content matching: {str(e)}")
-    
-    # Create TF-IDF vectorizer with enhanced params
-    vectorizer = TfidfVectorizer(
-        stop_words='english',
-        ngram_range=(1, 2),  # Include bigrams
-        max_features=5000,   # Limit features for efficiency
-        min_df=1,            # Minimum document frequency
-        max_df=0.9           # Maximum document frequency
-    )
     
-    try:
-        # Vectorize the texts
-        tfidf_matrix = vectorizer.fit_transform([resume_text, job_description])
-        
-        # Calculate cosine similarity
-        cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        
-        # Convert to percentage
-        similarity_score = cosine_sim * 100
-        
-        # If we're using spaCy, also compute a key-term match score
-        additional_score = 0
-        if HAS_SPACY and resume_keywords and job_keywords:
-            # Count keyword matches 
-            common_keywords = set(resume_keywords).intersection(set(job_keywords))
-            if common_keywords:
-                # Compute match percentage with a max cap
-                keyword_match = min(len(common_keywords) / max(len(job_keywords), 1) * 100, 100)
-                # Weight this less than the cosine similarity
-                additional_score = keyword_match * 0.3
-        
-        # Combine the scores
-        weighted_score = (similarity_score * 0.7) + additional_score
-        
-        # Apply a moderate curve to avoid overly high scores
-        final_score = min(weighted_score * 1.1, 100) 
-        
-        return final_score
-    except Exception as e:
-        logging.error(f"Error calculating content match: {str(e)}")
-        return 0
+    return text, keywords
+
+def combine_content_scores(cosine_sim, resume_keywords, job_keywords):
+    """Combine TF-IDF cosine similarity with the spaCy key-term match score"""
+    # Convert to percentage
+    similarity_score = cosine_sim * 100
+    
+    # If we're using spaCy, also compute a key-term match score
+    additional_score = 0
+    if HAS_SPACY and resume_keywords and job_keywords:
+        # Count keyword matches 
+        common_keywords = set(resume_keywords).intersection(set(job_keywords))
+        if common_keywords:
+            # Compute match percentage with a max cap
+            keyword_match = min(len(common_keywords) / max(len(job_keywords), 1) * 100, 100)
+            # Weight this less than the cosine similarity
+            additional_score = keyword_match * 0.3
+    
+    # Combine the scores
+    weighted_score = (similarity_score * 0.7) + additional_score
+    
+    # Apply a moderate curve to avoid overly high scores
+    return min(weighted_score * 1.1, 100)
         
 def extract_key_terms(text):
     """Extract important terms from text using frequency analysis"""
@@ -0,0 +1,92 @@
+import logging
+import re
+from collections import Counter
+
+
+def normalize_skill(skill):
+    """Normalise a skill name for lookups: lowercase, trimmed, single spaces"""
+    return re.sub(r'\s+', ' ', skill).strip().lower()
+
+
+class SkillIndex:
+    """
+    Inverted index from normalised skill to the candidates that list it
+
+    Used to shortlist candidates before the expensive TF-IDF and LLM
+    scoring: only candidates sharing at least ``min_shared`` skills with
+    the job description go on to be scored. Candidates can be added,
+    replaced and removed one at a time.
+    """
+
+    def __init__(self):
+        self.postings = {}    # skill -> set of candidate ids
+        self.candidates = {}  # candidate id -> frozenset of skills
+        self.last_stats = None
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self.candidates
+
+    def add(self, candidate_id, skills):
+        """Add a candidate's skills (extract_skills output), replacing any previous entry"""
+        self.remove(candidate_id)
+        normalized = frozenset(normalize_skill(skill) for skill in skills if skill and skill.strip())
+        self.candidates[candidate_id] = normalized
+        for skill in normalized:
+            self.postings.setdefault(skill, set()).add(candidate_id)
+
+    def remove(self, candidate_id):
+        """Remove a candidate; returns False if it wasn't indexed"""
+        skills = self.candidates.pop(candidate_id, None)
+        if skills is None:
+            return False
+        for skill in skills:
+            posting = self.postings.get(skill)
+            if posting is not None:
+                posting.discard(candidate_id)
+                if not posting:
+                    del self.postings[skill]
+        return True
+
+    def get_skills(self, candidate_id):
+        """Normalised skills of an indexed candidate"""
+        return sorted(self.candidates[candidate_id])
+
+    def prefilter(self, jd_skills, min_shared=1):
+        """
+        Candidates sharing at least min_shared skills with the job description
+
+        Only the postings of the JD's skills are read, so the cost depends on
+        how common those skills are rather than on the pool size.
+
+        Args:
+            jd_skills (iterable): Skills required by the job description
+            min_shared (int): Minimum number of shared skills
+
+        Returns:
+            list: Candidate ids, most shared skills first
+        """
+        required = {normalize_skill(skill) for skill in jd_skills if skill and skill.strip()}
+        shared = Counter()
+        for skill in sorted(required):
+            shared.update(self.postings.get(skill, ()))
+
+        shortlist = [candidate_id for candidate_id, count in shared.most_common() if count >= min_shared]
+        if min_shared <= 0:
+            # Everyone qualifies, including candidates with no shared skill
+            shortlist += [candidate_id for candidate_id in self.candidates if candidate_id not in shared]
+
+        pool = len(self.candidates)
+        self.last_stats = {
+            "pool": pool,
+            "shortlist": len(shortlist),
+            "jd_skills": len(required),
+            "indexed_jd_skills": sum(1 for skill in required if skill in self.postings),
+            "min_shared": min_shared,
+            "selectivity": round(len(shortlist) / pool, 4) if pool else 0.0,
+        }
+        logging.info(f"Skill prefilter kept {len(shortlist)}/{pool} candidates "
+                     f"(min_shared={min_shared}, {len(required)} JD skills)")
+        return shortlist
@@ -0,0 +1,117 @@
+import re
+import logging
+
+
+class SkillMatcher:
+    """
+    Match a fixed skill vocabulary against text in a single pass.
+
+    The vocabulary is folded into a character trie and compiled into one
+    regular expression, so the text is scanned once instead of once per
+    skill. Each skill keeps the ``\\b<skill>\\b`` case-insensitive rule that
+    ``extract_skills`` used before, including overlapping hits such as
+    "Ruby" inside "Ruby on Rails" or "SQL" inside "Spark SQL".
+    """
+
+    def __init__(self, skills):
+        # Lowercased surface form -> canonical skill name
+        self.skills = {}
+        for skill in sorted(skills):
+            self.skills.setdefault(skill.lower(), skill)
+
+        # Shorter skills that also match wherever a longer skill matches,
+        # because they are a word-bounded prefix of it
+        self._implied = {}
+        for key in self.skills:
+            implied = [
+                other for other in self.skills
+                if other != key and key.startswith(other)
+                and re.match(re.escape(other) + r'\b', key)
+            ]
+            if implied:
+                self._implied[key] = implied
+
+        self.pattern = self._compile()
+        logging.debug(f"Compiled skill matcher over {len(self.skills)} skills")
+
+    def _compile(self):
+        """Compile the vocabulary trie into a single overlapping-match regex"""
+        if not self.skills:
+            return None
+
+        trie = self._trie = {}
+        for key in self.skills:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        # Zero-width lookahead lets matches overlap at different start positions
+        return re.compile(r'(?=\b(' + self._trie_to_regex(trie) + r')\b)', re.IGNORECASE)
+
+    def _trie_to_regex(self, node):
+        """Render a trie node as a regex, preferring the longest alternative"""
+        terminal = '' in node
+        branches = [
+            re.escape(char) + self._trie_to_regex(child)
+            for char, child in sorted(node.items()) if char
+        ]
+
+        if not branches:
+            return ''
+
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # Greedy optional: try the longer skill first, fall back to this one
+            return '(?:' + body + ')?'
+        return body
+
+    def _resolve(self, matched, node=None):
+        """
+        Key of a matched string whose lowercase form isn't a key
+
+        IGNORECASE also pairs characters that lower() doesn't map onto each
+        other (e.g. "ſ" matches "s", "İ" matches "i"), so walk the trie
+        with the regex engine's own case-insensitive comparison.
+        """
+        node = self._trie if node is None else node
+        if not matched:
+            return '' if '' in node else None
+        char = matched[0]
+        for edge, child in node.items():
+            if edge and (edge == char.lower() or re.fullmatch(re.escape(edge), char, re.IGNORECASE)):
+                rest = self._resolve(matched[1:], child)
+                if rest is not None:
+                    return edge + rest
+        return None
+
+    def find_all(self, text):
+        """
+        Find every vocabulary skill mentioned in the text
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            list: (skill, start, end) tuples in order of appearance
+        """
+        if not self.pattern or not text:
+            return []
+
+        hits = []
+        for match in self.pattern.finditer(text):
+            start = match.start(1)
+            key = match.group(1).lower()
+            if key not in self.skills:
+                key = self._resolve(match.group(1))
+                if key is None:
+                    logging.debug(f"Skill match {match.group(1)!r} has no vocabulary entry")
+                    continue
+            hits.append((self.skills[key], start, match.end(1)))
+            for other in self._implied.get(key, []):
+                hits.append((self.skills[other], start, start + len(other)))
+        return hits
+
+    def find_skills(self, text):
+        """Return the set of vocabulary skills mentioned in the text"""
+        return {skill for skill, _, _ in self.find_all(text)}